@@ -0,0 +1,33 @@
+"""add adaptive source polling state
+
+Revision ID: 0004_source_polling
+Revises: 0003_oauth_states
+Create Date: 2026-10-18 00:00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004_source_polling"
+down_revision = "0003_oauth_states"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("sources", sa.Column("next_poll_at", sa.DateTime(timezone=True), nullable=True))
+    op.add_column("sources", sa.Column("poll_interval_seconds", sa.Integer(), nullable=True))
+    op.add_column(
+        "sources",
+        sa.Column("failure_count", sa.Integer(), server_default=sa.text("0"), nullable=False),
+    )
+    op.add_column("sources", sa.Column("last_error", sa.Text(), nullable=True))
+    op.create_index("ix_sources_next_poll_at", "sources", ["next_poll_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_sources_next_poll_at", table_name="sources")
+    op.drop_column("sources", "last_error")
+    op.drop_column("sources", "failure_count")
+    op.drop_column("sources", "poll_interval_seconds")
+    op.drop_column("sources", "next_poll_at")
@@ -0,0 +1,29 @@
+"""add near-duplicate story clusters to ideas
+
+Revision ID: 0005_idea_clusters
+Revises: 0004_source_polling
+Create Date: 2026-10-18 00:00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0005_idea_clusters"
+down_revision = "0004_source_polling"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("ideas", sa.Column("lsh_bands", postgresql.ARRAY(sa.Integer()), nullable=True))
+    op.add_column("ideas", sa.Column("cluster_id", postgresql.UUID(as_uuid=True), nullable=True))
+    op.create_index("ix_ideas_cluster_id", "ideas", ["cluster_id"])
+    op.create_index("ix_ideas_lsh_bands", "ideas", ["lsh_bands"], postgresql_using="gin")
+
+
+def downgrade() -> None:
+    op.drop_index("ix_ideas_lsh_bands", table_name="ideas")
+    op.drop_index("ix_ideas_cluster_id", table_name="ideas")
+    op.drop_column("ideas", "cluster_id")
+    op.drop_column("ideas", "lsh_bands")
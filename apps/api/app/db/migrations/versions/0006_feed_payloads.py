@@ -0,0 +1,47 @@
+"""add feed payload log
+
+Revision ID: 0006_feed_payloads
+Revises: 0005_idea_clusters
+Create Date: 2026-10-18 00:00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0006_feed_payloads"
+down_revision = "0005_idea_clusters"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "feed_payloads",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column(
+            "source_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("sources.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("content_hash", sa.String(length=64), nullable=False),
+        sa.Column("content_type", sa.String(length=200)),
+        sa.Column("size", sa.Integer(), server_default=sa.text("0"), nullable=False),
+        sa.Column(
+            "fetched_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+    )
+    op.create_index(
+        "ix_feed_payloads_source_id_fetched_at", "feed_payloads", ["source_id", "fetched_at"]
+    )
+    op.create_index("ix_feed_payloads_fetched_at", "feed_payloads", ["fetched_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_feed_payloads_fetched_at", table_name="feed_payloads")
+    op.drop_index("ix_feed_payloads_source_id_fetched_at", table_name="feed_payloads")
+    op.drop_table("feed_payloads")
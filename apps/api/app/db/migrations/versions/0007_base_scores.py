@@ -0,0 +1,41 @@
+"""store base idea scores, recency is applied at query time
+
+Revision ID: 0007_base_scores
+Revises: 0006_feed_payloads
+Create Date: 2026-10-18 00:00:00
+"""
+
+from alembic import op
+
+revision = "0007_base_scores"
+down_revision = "0006_feed_payloads"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Drop the recency term that used to be baked in at scoring time.
+    op.execute(
+        """
+        UPDATE ideas
+        SET score = round(
+            (least(coalesce(char_length(title), 0) / 120.0, 1.0) * 0.4
+             + least(coalesce(char_length(summary), 0) / 500.0, 1.0) * 0.4)::numeric,
+            4
+        )
+        WHERE status <> 'new'
+        """
+    )
+    op.execute(
+        """
+        UPDATE drafts
+        SET score = ideas.score
+        FROM ideas
+        WHERE drafts.idea_id = ideas.id
+        """
+    )
+
+
+def downgrade() -> None:
+    # The old scores mixed in recency as of scoring time; there is nothing to restore.
+    pass
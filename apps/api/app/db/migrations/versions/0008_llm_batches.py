@@ -0,0 +1,45 @@
+"""add llm batch submissions
+
+Revision ID: 0008_llm_batches
+Revises: 0007_base_scores
+Create Date: 2026-10-18 00:00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0008_llm_batches"
+down_revision = "0007_base_scores"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "llm_batches",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("provider", sa.String(length=50), nullable=False),
+        sa.Column("external_id", sa.String(length=200), nullable=False),
+        sa.Column("status", sa.String(length=50), server_default="submitted", nullable=False),
+        sa.Column("request_count", sa.Integer(), server_default=sa.text("0"), nullable=False),
+        sa.Column(
+            "stats",
+            postgresql.JSONB(astext_type=sa.Text()),
+            server_default=sa.text("'{}'::jsonb"),
+            nullable=False,
+        ),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column("completed_at", sa.DateTime(timezone=True)),
+    )
+    op.create_index("ix_llm_batches_status", "llm_batches", ["status"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_llm_batches_status", table_name="llm_batches")
+    op.drop_table("llm_batches")
@@ -0,0 +1,26 @@
+"""add near-duplicate index bands to drafts
+
+Revision ID: 0009_draft_lsh_bands
+Revises: 0008_llm_batches
+Create Date: 2026-10-18 00:00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0009_draft_lsh_bands"
+down_revision = "0008_llm_batches"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Existing drafts are indexed by guardrails_check on its next run.
+    op.add_column("drafts", sa.Column("lsh_bands", postgresql.ARRAY(sa.Integer()), nullable=True))
+    op.create_index("ix_drafts_lsh_bands", "drafts", ["lsh_bands"], postgresql_using="gin")
+
+
+def downgrade() -> None:
+    op.drop_index("ix_drafts_lsh_bands", table_name="drafts")
+    op.drop_column("drafts", "lsh_bands")
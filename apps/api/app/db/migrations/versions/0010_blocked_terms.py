@@ -0,0 +1,40 @@
+"""add per-workspace blocked terms
+
+Revision ID: 0010_blocked_terms
+Revises: 0009_draft_lsh_bands
+Create Date: 2026-10-18 00:00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0010_blocked_terms"
+down_revision = "0009_draft_lsh_bands"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "blocked_terms",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column(
+            "workspace_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("workspaces.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("term", sa.String(length=200), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.UniqueConstraint("workspace_id", "term", name="uq_blocked_terms_workspace_term"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("blocked_terms")
@@ -0,0 +1,35 @@
+"""store hashed text features on drafts and ideas
+
+Revision ID: 0011_text_features
+Revises: 0010_blocked_terms
+Create Date: 2026-10-18 00:00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0011_text_features"
+down_revision = "0010_blocked_terms"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Left empty for existing rows: guardrails_check fills drafts, and older ideas
+    # fall back to their text until they age out.
+    op.add_column("drafts", sa.Column("token_hashes", postgresql.ARRAY(sa.Integer()), nullable=True))
+    op.add_column("drafts", sa.Column("has_link", sa.Boolean(), nullable=True))
+    op.add_column("ideas", sa.Column("shingle_hashes", postgresql.ARRAY(sa.Integer()), nullable=True))
+    op.add_column(
+        "ideas", sa.Column("summary_token_hashes", postgresql.ARRAY(sa.Integer()), nullable=True)
+    )
+    op.add_column("ideas", sa.Column("raw_token_hashes", postgresql.ARRAY(sa.Integer()), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("ideas", "raw_token_hashes")
+    op.drop_column("ideas", "summary_token_hashes")
+    op.drop_column("ideas", "shingle_hashes")
+    op.drop_column("drafts", "has_link")
+    op.drop_column("drafts", "token_hashes")
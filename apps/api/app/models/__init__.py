@@ -1,8 +1,11 @@
 from app.models.models import (
     AccountSettings,
     AuditLog,
+    BlockedTerm,
     Draft,
+    FeedPayload,
     Idea,
+    LLMBatch,
     OAuthState,
     Post,
     PostMetricsDaily,
@@ -17,8 +20,11 @@ from app.models.models import (
 __all__ = [
     "AccountSettings",
     "AuditLog",
+    "BlockedTerm",
     "Draft",
+    "FeedPayload",
     "Idea",
+    "LLMBatch",
     "OAuthState",
     "Post",
     "PostMetricsDaily",
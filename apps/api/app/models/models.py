@@ -5,7 +5,7 @@ from typing import Optional
 from uuid import UUID, uuid4
 
 import sqlalchemy as sa
-from sqlalchemy.dialects.postgresql import JSONB, UUID as PGUUID
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB, UUID as PGUUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
@@ -26,6 +26,7 @@ class Workspace(Base):
     ideas: Mapped[list["Idea"]] = relationship(back_populates="workspace")
     drafts: Mapped[list["Draft"]] = relationship(back_populates="workspace")
     audit_logs: Mapped[list["AuditLog"]] = relationship(back_populates="workspace")
+    blocked_terms: Mapped[list["BlockedTerm"]] = relationship(back_populates="workspace")
 
 
 class User(Base):
@@ -189,6 +190,12 @@ class Source(Base):
         sa.Boolean, nullable=False, server_default=sa.text("true")
     )
     last_ingested_at: Mapped[datetime | None] = mapped_column(sa.DateTime(timezone=True))
+    next_poll_at: Mapped[datetime | None] = mapped_column(sa.DateTime(timezone=True), index=True)
+    poll_interval_seconds: Mapped[int | None] = mapped_column(sa.Integer)
+    failure_count: Mapped[int] = mapped_column(
+        sa.Integer, nullable=False, server_default=sa.text("0")
+    )
+    last_error: Mapped[str | None] = mapped_column(sa.Text)
     config: Mapped[dict] = mapped_column(
         JSONB, nullable=False, default=dict, server_default=sa.text("'{}'::jsonb")
     )
@@ -205,6 +212,48 @@ class Source(Base):
     )
 
 
+class FeedPayload(Base):
+    __tablename__ = "feed_payloads"
+
+    id: Mapped[UUID] = mapped_column(PGUUID(as_uuid=True), primary_key=True, default=uuid4)
+    source_id: Mapped[UUID] = mapped_column(
+        PGUUID(as_uuid=True),
+        sa.ForeignKey("sources.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    content_hash: Mapped[str] = mapped_column(sa.String(64), nullable=False)
+    content_type: Mapped[str | None] = mapped_column(sa.String(200))
+    size: Mapped[int] = mapped_column(sa.Integer, nullable=False, server_default=sa.text("0"))
+    fetched_at: Mapped[datetime] = mapped_column(
+        sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False, index=True
+    )
+
+    __table_args__ = (
+        sa.Index("ix_feed_payloads_source_id_fetched_at", "source_id", "fetched_at"),
+    )
+
+
+class BlockedTerm(Base):
+    __tablename__ = "blocked_terms"
+
+    id: Mapped[UUID] = mapped_column(PGUUID(as_uuid=True), primary_key=True, default=uuid4)
+    workspace_id: Mapped[UUID] = mapped_column(
+        PGUUID(as_uuid=True),
+        sa.ForeignKey("workspaces.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    term: Mapped[str] = mapped_column(sa.String(200), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False
+    )
+
+    workspace: Mapped["Workspace"] = relationship(back_populates="blocked_terms")
+
+    __table_args__ = (
+        sa.UniqueConstraint("workspace_id", "term", name="uq_blocked_terms_workspace_term"),
+    )
+
+
 class Idea(Base):
     __tablename__ = "ideas"
 
@@ -228,6 +277,11 @@ class Idea(Base):
     published_at: Mapped[datetime | None] = mapped_column(sa.DateTime(timezone=True))
     raw_content: Mapped[str | None] = mapped_column(sa.Text)
     fingerprint: Mapped[str] = mapped_column(sa.String(64), unique=True, index=True)
+    lsh_bands: Mapped[list[int] | None] = mapped_column(ARRAY(sa.Integer))
+    shingle_hashes: Mapped[list[int] | None] = mapped_column(ARRAY(sa.Integer))
+    summary_token_hashes: Mapped[list[int] | None] = mapped_column(ARRAY(sa.Integer))
+    raw_token_hashes: Mapped[list[int] | None] = mapped_column(ARRAY(sa.Integer))
+    cluster_id: Mapped[UUID | None] = mapped_column(PGUUID(as_uuid=True), index=True)
     score: Mapped[float] = mapped_column(sa.Float, nullable=False, server_default=sa.text("0"))
     status: Mapped[str] = mapped_column(sa.String(50), nullable=False, server_default="new")
     created_at: Mapped[datetime] = mapped_column(
@@ -239,6 +293,31 @@ class Idea(Base):
     source: Mapped[Optional["Source"]] = relationship(back_populates="ideas")
     drafts: Mapped[list["Draft"]] = relationship(back_populates="idea")
 
+    __table_args__ = (
+        sa.Index("ix_ideas_lsh_bands", "lsh_bands", postgresql_using="gin"),
+    )
+
+
+class LLMBatch(Base):
+    __tablename__ = "llm_batches"
+
+    id: Mapped[UUID] = mapped_column(PGUUID(as_uuid=True), primary_key=True, default=uuid4)
+    provider: Mapped[str] = mapped_column(sa.String(50), nullable=False)
+    external_id: Mapped[str] = mapped_column(sa.String(200), nullable=False)
+    status: Mapped[str] = mapped_column(
+        sa.String(50), nullable=False, server_default="submitted", index=True
+    )
+    request_count: Mapped[int] = mapped_column(
+        sa.Integer, nullable=False, server_default=sa.text("0")
+    )
+    stats: Mapped[dict] = mapped_column(
+        JSONB, nullable=False, default=dict, server_default=sa.text("'{}'::jsonb")
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False
+    )
+    completed_at: Mapped[datetime | None] = mapped_column(sa.DateTime(timezone=True))
+
 
 class Draft(Base):
     __tablename__ = "drafts"
@@ -267,6 +346,9 @@ class Draft(Base):
         sa.Integer, nullable=False, server_default=sa.text("1")
     )
     score: Mapped[float] = mapped_column(sa.Float, nullable=False, server_default=sa.text("0"))
+    lsh_bands: Mapped[list[int] | None] = mapped_column(ARRAY(sa.Integer))
+    token_hashes: Mapped[list[int] | None] = mapped_column(ARRAY(sa.Integer))
+    has_link: Mapped[bool | None] = mapped_column(sa.Boolean)
     status: Mapped[str] = mapped_column(sa.String(50), nullable=False, server_default="draft")
     created_at: Mapped[datetime] = mapped_column(
         sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False
@@ -281,6 +363,10 @@ class Draft(Base):
     schedule_items: Mapped[list["ScheduleQueue"]] = relationship(back_populates="draft")
     posts: Mapped[list["Post"]] = relationship(back_populates="draft")
 
+    __table_args__ = (
+        sa.Index("ix_drafts_lsh_bands", "lsh_bands", postgresql_using="gin"),
+    )
+
 
 class ScheduleQueue(Base):
     __tablename__ = "schedule_queue"
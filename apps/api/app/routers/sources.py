@@ -1,17 +1,35 @@
 from __future__ import annotations
 
+from urllib.parse import urlsplit
+
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
 
 from app.db.session import get_db
 from app.models import Source, XAccount
 from app.routers.deps import get_current_user
-from app.schemas.sources import SourceCreate, SourceResponse
+from app.schemas.sources import (
+    SourceCreate,
+    SourceImportRequest,
+    SourceImportResponse,
+    SourceImportStatus,
+    SourceResponse,
+)
+from app.services.celery_client import import_job_workspace, probe_sources, task_status
+from app.services.opml import parse_opml
 
 
 router = APIRouter(prefix="/sources", tags=["sources"])
 
+MAX_IMPORT_URLS = 5000
+
+
+def _valid_feed_url(url: str) -> bool:
+    parts = urlsplit(url)
+    return parts.scheme in {"http", "https"} and bool(parts.netloc) and len(url) <= 2000
+
 
 @router.get("", response_model=list[SourceResponse])
 def list_sources(
@@ -47,3 +65,67 @@ def create_source(
     db.commit()
     db.refresh(source)
     return SourceResponse.model_validate(source)
+
+
+@router.post("/import", response_model=SourceImportResponse)
+def import_sources(
+    payload: SourceImportRequest,
+    db: Session = Depends(get_db),
+    user=Depends(get_current_user),
+) -> SourceImportResponse:
+    if payload.workspace_id != user.workspace_id:
+        raise HTTPException(status_code=403, detail="Invalid workspace")
+
+    if payload.x_account_id:
+        account = db.get(XAccount, payload.x_account_id)
+        if not account or account.workspace_id != user.workspace_id:
+            raise HTTPException(status_code=404, detail="Account not found")
+
+    candidates = [url.strip() for url in payload.urls]
+    if payload.opml:
+        try:
+            candidates.extend(parse_opml(payload.opml))
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
+
+    urls = list(dict.fromkeys(url for url in candidates if _valid_feed_url(url)))
+    invalid = [url for url in candidates if not _valid_feed_url(url)]
+    if len(urls) > MAX_IMPORT_URLS:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_IMPORT_URLS} feeds per import")
+    if not urls:
+        return SourceImportResponse(job_id=None, created=0, duplicates=0, invalid=invalid)
+
+    created_ids = db.scalars(
+        insert(Source)
+        .values(
+            [
+                {
+                    "workspace_id": user.workspace_id,
+                    "x_account_id": payload.x_account_id,
+                    "type": payload.type,
+                    "url": url,
+                    "is_enabled": payload.is_enabled,
+                }
+                for url in urls
+            ]
+        )
+        .on_conflict_do_nothing(constraint="uq_sources_workspace_url")
+        .returning(Source.id)
+    ).all()
+    db.commit()
+
+    job_id = probe_sources(list(created_ids), user.workspace_id) if created_ids else None
+    return SourceImportResponse(
+        job_id=job_id,
+        created=len(created_ids),
+        duplicates=len(urls) - len(created_ids),
+        invalid=invalid,
+    )
+
+
+@router.get("/import/{job_id}", response_model=SourceImportStatus)
+def import_status(job_id: str, user=Depends(get_current_user)) -> SourceImportStatus:
+    if import_job_workspace(job_id) != str(user.workspace_id):
+        raise HTTPException(status_code=404, detail="Import job not found")
+    state, info = task_status(job_id)
+    return SourceImportStatus(job_id=job_id, state=state, progress=info)
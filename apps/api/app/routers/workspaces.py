@@ -1,17 +1,25 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import delete, select
 from sqlalchemy.orm import Session
 
 from app.db.session import get_db
-from app.models import Workspace
+from app.models import BlockedTerm, Workspace
 from app.routers.deps import get_current_user
-from app.schemas.workspaces import WorkspaceCreate, WorkspaceResponse
+from app.schemas.workspaces import (
+    BlocklistResponse,
+    BlocklistUpdate,
+    WorkspaceCreate,
+    WorkspaceResponse,
+)
+from shared.utils.text import normalize_text
 
 
 router = APIRouter(prefix="/workspaces", tags=["workspaces"])
 
+MAX_BLOCKED_TERMS = 10000
+
 
 @router.get("", response_model=list[WorkspaceResponse])
 def list_workspaces(
@@ -33,3 +41,40 @@ def create_workspace(
     db.commit()
     db.refresh(workspace)
     return WorkspaceResponse.model_validate(workspace)
+
+
+def _workspace_terms(db: Session, workspace_id) -> list[str]:
+    return list(
+        db.scalars(
+            select(BlockedTerm.term)
+            .where(BlockedTerm.workspace_id == workspace_id)
+            .order_by(BlockedTerm.term)
+        ).all()
+    )
+
+
+@router.get("/blocklist", response_model=BlocklistResponse)
+def get_blocklist(
+    db: Session = Depends(get_db),
+    user=Depends(get_current_user),
+) -> BlocklistResponse:
+    return BlocklistResponse(terms=_workspace_terms(db, user.workspace_id))
+
+
+@router.put("/blocklist", response_model=BlocklistResponse)
+def replace_blocklist(
+    payload: BlocklistUpdate,
+    db: Session = Depends(get_db),
+    user=Depends(get_current_user),
+) -> BlocklistResponse:
+    """Replace the workspace's blocked terms; they apply on top of the global list."""
+    terms = sorted({normalize_text(term) for term in payload.terms} - {""})
+    if len(terms) > MAX_BLOCKED_TERMS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BLOCKED_TERMS} terms")
+    if any(len(term) > 200 for term in terms):
+        raise HTTPException(status_code=400, detail="Terms are limited to 200 characters")
+
+    db.execute(delete(BlockedTerm).where(BlockedTerm.workspace_id == user.workspace_id))
+    db.add_all(BlockedTerm(workspace_id=user.workspace_id, term=term) for term in terms)
+    db.commit()
+    return BlocklistResponse(terms=_workspace_terms(db, user.workspace_id))
@@ -15,6 +15,7 @@ class IdeaResponse(BaseModel):
     summary: str | None
     url: str | None
     published_at: datetime | None
+    cluster_id: UUID | None = None
     score: float
     status: str
     created_at: datetime
@@ -22,3 +22,25 @@ class SourceResponse(BaseModel):
     url: str
     is_enabled: bool
     last_ingested_at: datetime | None
+
+
+class SourceImportRequest(BaseModel):
+    workspace_id: UUID
+    x_account_id: UUID | None = None
+    type: str = "rss"
+    is_enabled: bool = True
+    urls: list[str] = []
+    opml: str | None = None
+
+
+class SourceImportResponse(BaseModel):
+    job_id: str | None
+    created: int
+    duplicates: int
+    invalid: list[str]
+
+
+class SourceImportStatus(BaseModel):
+    job_id: str
+    state: str
+    progress: dict | None = None
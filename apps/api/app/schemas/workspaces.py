@@ -12,3 +12,11 @@ class WorkspaceResponse(BaseModel):
 
     id: UUID
     name: str
+
+
+class BlocklistUpdate(BaseModel):
+    terms: list[str]
+
+
+class BlocklistResponse(BaseModel):
+    terms: list[str]
@@ -0,0 +1,268 @@
+from __future__ import annotations
+
+import hashlib
+import math
+import mmap
+import os
+import threading
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Protocol
+
+from app.core.config import settings
+from shared.utils.env import env_float, env_int
+
+
+class BitStore(Protocol):
+    size: int
+
+    def ready(self) -> bool:
+        ...
+
+    def set_bits(self, positions: list[int]) -> None:
+        ...
+
+    def get_bits(self, positions: list[int]) -> list[bool]:
+        ...
+
+    def count(self) -> int:
+        ...
+
+    def fresh(self) -> "BitStore":
+        ...
+
+    def replace_with(self, other: "BitStore") -> None:
+        ...
+
+
+class LocalBitStore:
+    """Bit array in process memory, or in an mmap'd file shared by workers on one host.
+
+    While a rebuild is staging a new array, bits set on the live store are
+    written to the staging array as well, so nothing added meanwhile is lost.
+    """
+
+    def __init__(self, size: int, path: str | None = None, staging: bool = False) -> None:
+        self.size = size
+        self.path = Path(path) if path else None
+        self._bits: bytearray | mmap.mmap | None = None
+        self._inode: int | None = None
+        self._ready = False
+        self._staging: LocalBitStore | None = None
+        if self.path is None:
+            self._bits = bytearray(self._byte_len)
+        elif not staging:
+            self._staging = LocalBitStore(size, str(self._staging_path), staging=True)
+
+    @property
+    def _staging_path(self) -> Path:
+        return self.path.with_suffix(".rebuild")
+
+    @property
+    def _byte_len(self) -> int:
+        return (self.size + 7) // 8
+
+    def _buffer(self) -> bytearray | mmap.mmap | None:
+        if self.path is None:
+            return self._bits
+        try:
+            inode = self.path.stat().st_ino
+        except FileNotFoundError:
+            return None
+        if inode != self._inode:
+            # Another process rebuilt the file; map the new one.
+            with self.path.open("r+b") as handle:
+                self._bits = mmap.mmap(handle.fileno(), self._byte_len)
+            self._inode = inode
+        return self._bits
+
+    def ready(self) -> bool:
+        if self.path is None:
+            return self._ready
+        return self._buffer() is not None
+
+    def set_bits(self, positions: list[int]) -> None:
+        if self._staging is not None:
+            self._staging.set_bits(positions)
+        bits = self._buffer()
+        if bits is None:
+            return
+        for position in positions:
+            bits[position >> 3] |= 1 << (position & 7)
+
+    def get_bits(self, positions: list[int]) -> list[bool]:
+        bits = self._buffer()
+        if bits is None:
+            return [False] * len(positions)
+        return [bool(bits[position >> 3] & (1 << (position & 7))) for position in positions]
+
+    def count(self) -> int:
+        bits = self._buffer()
+        if bits is None:
+            return 0
+        return int.from_bytes(bytes(bits), "little").bit_count()
+
+    def fresh(self) -> "LocalBitStore":
+        if self.path is None:
+            self._staging = LocalBitStore(self.size)
+            return self._staging
+        # A new inode, so workers still mapping a stale staging file never see it shrink.
+        staging = self._staging_path
+        staging.unlink(missing_ok=True)
+        with staging.open("xb") as handle:
+            handle.truncate(self._byte_len)
+        return LocalBitStore(self.size, str(staging), staging=True)
+
+    def replace_with(self, other: "LocalBitStore") -> None:
+        if self.path is None:
+            self._bits = other._bits
+            self._ready = True
+            self._staging = None
+            return
+        if other.path is not None:
+            os.replace(other.path, self.path)
+
+
+# Sets bits on the live key and, while a rebuild is staging one, on the staging key;
+# atomic against the RENAME that swaps the staging key in.
+_SET_BITS_SCRIPT = """
+local mirror = KEYS[2] and redis.call('exists', KEYS[2]) == 1
+for _, position in ipairs(ARGV) do
+    redis.call('setbit', KEYS[1], position, 1)
+    if mirror then
+        redis.call('setbit', KEYS[2], position, 1)
+    end
+end
+return #ARGV
+"""
+
+
+class RedisBitStore:
+    """Bit array in a Redis string, shared by every worker that can reach the server."""
+
+    def __init__(self, size: int, key: str, client=None, staging: bool = False) -> None:
+        self.size = size
+        self.key = key
+        self.staging_key = None if staging else f"{key}:rebuild"
+        if client is None:
+            import redis
+
+            client = redis.Redis.from_url(settings.redis_url)
+        self.client = client
+
+    def ready(self) -> bool:
+        return bool(self.client.exists(self.key))
+
+    def set_bits(self, positions: list[int]) -> None:
+        if not positions:
+            return
+        keys = [self.key] if self.staging_key is None else [self.key, self.staging_key]
+        self.client.eval(_SET_BITS_SCRIPT, len(keys), *keys, *positions)
+
+    def get_bits(self, positions: list[int]) -> list[bool]:
+        pipe = self.client.pipeline(transaction=False)
+        for position in positions:
+            pipe.getbit(self.key, position)
+        return [bool(bit) for bit in pipe.execute()]
+
+    def count(self) -> int:
+        return int(self.client.bitcount(self.key))
+
+    def fresh(self) -> "RedisBitStore":
+        staging = RedisBitStore(self.size, self.staging_key, self.client, staging=True)
+        self.client.delete(staging.key)
+        # Allocate the full string up front so memory metrics are accurate from the start.
+        self.client.setbit(staging.key, self.size - 1, 0)
+        return staging
+
+    def replace_with(self, other: "RedisBitStore") -> None:
+        self.client.rename(other.key, self.key)
+
+
+class BloomFilter:
+    def __init__(self, store: BitStore, hashes: int) -> None:
+        self.store = store
+        self.hashes = hashes
+
+    @staticmethod
+    def sizing(capacity: int, error_rate: float) -> tuple[int, int]:
+        bits = math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))
+        hashes = max(1, round(bits / capacity * math.log(2)))
+        return bits, hashes
+
+    def _positions(self, item: str) -> list[int]:
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "big")
+        second = int.from_bytes(digest[8:], "big") | 1
+        return [(first + i * second) % self.store.size for i in range(self.hashes)]
+
+    def ready(self) -> bool:
+        return self.store.ready()
+
+    def add_many(self, items: Iterable[str]) -> None:
+        positions = [position for item in items for position in self._positions(item)]
+        if positions:
+            self.store.set_bits(positions)
+
+    def might_contain_many(self, items: list[str]) -> list[bool]:
+        if not items:
+            return []
+        bits = self.store.get_bits([p for item in items for p in self._positions(item)])
+        return [
+            all(bits[i * self.hashes : (i + 1) * self.hashes]) for i in range(len(items))
+        ]
+
+    def rebuild(self, items: Iterable[str], batch_size: int = 10_000) -> int:
+        staging = BloomFilter(self.store.fresh(), self.hashes)
+        added = 0
+        batch: list[str] = []
+        for item in items:
+            batch.append(item)
+            if len(batch) >= batch_size:
+                staging.add_many(batch)
+                added += len(batch)
+                batch = []
+        staging.add_many(batch)
+        added += len(batch)
+        self.store.replace_with(staging.store)
+        return added
+
+    def metrics(self) -> dict:
+        size = self.store.size
+        bits_set = self.store.count() if self.ready() else 0
+        fill = bits_set / size if size else 0.0
+        estimated_items = 0
+        if 0 < fill < 1:
+            estimated_items = round(-size / self.hashes * math.log(1 - fill))
+        return {
+            "ready": self.ready(),
+            "bits": size,
+            "hashes": self.hashes,
+            "memory_bytes": (size + 7) // 8,
+            "fill_ratio": round(fill, 6),
+            "estimated_items": estimated_items,
+            "false_positive_rate": round(fill**self.hashes, 6),
+        }
+
+
+_idea_filter: BloomFilter | None = None
+_idea_filter_lock = threading.Lock()
+
+
+def get_idea_filter() -> BloomFilter:
+    global _idea_filter
+    with _idea_filter_lock:
+        if _idea_filter is None:
+            capacity = env_int("IDEA_FILTER_CAPACITY", 5_000_000)
+            error_rate = env_float("IDEA_FILTER_ERROR_RATE", 0.01)
+            bits, hashes = BloomFilter.sizing(capacity, error_rate)
+            if os.getenv("IDEA_FILTER_BACKEND", "redis").lower() == "local":
+                path = os.getenv("IDEA_FILTER_PATH")
+                if not path:
+                    # An in-memory filter would only ever see its own process's rebuilds.
+                    raise RuntimeError("IDEA_FILTER_PATH is required for the local idea filter")
+                store: BitStore = LocalBitStore(bits, path)
+            else:
+                store = RedisBitStore(bits, "signalforge:bloom:idea_fingerprints")
+            _idea_filter = BloomFilter(store, hashes)
+        return _idea_filter
@@ -1,5 +1,8 @@
 from __future__ import annotations
 
+from datetime import timedelta
+from uuid import UUID, uuid4
+
 from celery import Celery
 
 from app.core.config import settings
@@ -25,3 +28,38 @@ def trigger_pipeline() -> dict:
     for name in task_names:
         results[name] = celery_client.send_task(name).id
     return results
+
+
+IMPORT_JOB_TTL = timedelta(days=7)
+
+
+def _import_job_key(job_id: str) -> str:
+    return f"signalforge:import_job:{job_id}"
+
+
+def probe_sources(source_ids: list[UUID], workspace_id: UUID) -> str:
+    # Ownership is recorded before dispatch, so the job is never visible unowned.
+    job_id = str(uuid4())
+    celery_client.backend.client.set(
+        _import_job_key(job_id), str(workspace_id), ex=int(IMPORT_JOB_TTL.total_seconds())
+    )
+    celery_client.send_task(
+        "probe_sources",
+        args=[[str(source_id) for source_id in source_ids], str(workspace_id)],
+        task_id=job_id,
+    )
+    return job_id
+
+
+def import_job_workspace(job_id: str) -> str | None:
+    """Workspace id that dispatched an import job, or None for unknown or expired jobs."""
+    owner = celery_client.backend.client.get(_import_job_key(job_id))
+    if owner is None:
+        return None
+    return owner.decode() if isinstance(owner, bytes) else owner
+
+
+def task_status(task_id: str) -> tuple[str, dict | None]:
+    result = celery_client.AsyncResult(task_id)
+    info = result.info if isinstance(result.info, dict) else None
+    return result.state, info
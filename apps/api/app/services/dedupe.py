@@ -1,27 +1,18 @@
 from __future__ import annotations
 
-import re
+import hashlib
 from collections import Counter
 
-from shared.utils.text import normalize_text
-
-
-_word_re = re.compile(r"[a-z0-9']+")
+from shared.utils.text import SHINGLE_SIZE, text_features, word_shingles
 
 
 def tokenize(text: str) -> list[str]:
-    normalized = normalize_text(text)
-    return _word_re.findall(normalized)
+    return list(text_features(text).tokens)
 
 
-def token_overlap_ratio(a: str, b: str) -> float:
-    tokens_a = tokenize(a)
-    tokens_b = tokenize(b)
-    if not tokens_a or not tokens_b:
+def _multiset_overlap(counts_a: Counter, counts_b: Counter) -> float:
+    if not counts_a or not counts_b:
         return 0.0
-
-    counts_a = Counter(tokens_a)
-    counts_b = Counter(tokens_b)
     intersection = sum((counts_a & counts_b).values())
     union = sum((counts_a | counts_b).values())
     if union == 0:
@@ -29,5 +20,76 @@ def token_overlap_ratio(a: str, b: str) -> float:
     return intersection / union
 
 
+def token_overlap_ratio(a: str, b: str) -> float:
+    return _multiset_overlap(text_features(a).token_counts, text_features(b).token_counts)
+
+
+def token_hash_overlap_ratio(a: list[int], b: list[int]) -> float:
+    """token_overlap_ratio over stored token_hashes columns."""
+    return _multiset_overlap(Counter(a), Counter(b))
+
+
 def is_similar(a: str, b: str, threshold: float = 0.85) -> bool:
     return token_overlap_ratio(a, b) >= threshold
+
+
+MINHASH_BANDS = 21
+MINHASH_ROWS = 3
+MINHASH_PERMUTATIONS = MINHASH_BANDS * MINHASH_ROWS
+_MERSENNE_PRIME = (1 << 61) - 1
+_BAND_HASH_BITS = 26
+
+
+def _hash64(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+# Fixed permutations so signatures stay comparable across processes and deploys.
+_PERMUTATIONS = [
+    (
+        _hash64(f"minhash-a-{i}") % (_MERSENNE_PRIME - 1) + 1,
+        _hash64(f"minhash-b-{i}") % _MERSENNE_PRIME,
+    )
+    for i in range(MINHASH_PERMUTATIONS)
+]
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> set[str]:
+    features = text_features(text)
+    if size == SHINGLE_SIZE:
+        return set(features.shingles)
+    return set(word_shingles(features.tokens, size))
+
+
+def jaccard(a: set, b: set) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def minhash(features: set[str]) -> list[int] | None:
+    if not features:
+        return None
+    hashed = [_hash64(feature) % _MERSENNE_PRIME for feature in features]
+    return [min((a * h + b) % _MERSENNE_PRIME for h in hashed) for a, b in _PERMUTATIONS]
+
+
+def lsh_bands(signature: list[int]) -> list[int]:
+    # Each band collapses MINHASH_ROWS signature values into one int32; the band index
+    # sits in the high bits so equal hashes from different bands never collide.
+    bands = []
+    for band in range(MINHASH_BANDS):
+        rows = signature[band * MINHASH_ROWS : (band + 1) * MINHASH_ROWS]
+        digest = hashlib.blake2b(repr(rows).encode("ascii"), digest_size=4).digest()
+        value = int.from_bytes(digest, "big") >> (32 - _BAND_HASH_BITS)
+        bands.append((band << _BAND_HASH_BITS) | value)
+    return bands
+
+
+def content_bands(text: str) -> list[int]:
+    """LSH bands over a text's distinct words, matching what token_overlap_ratio compares.
+
+    Empty for texts without words, so they are not mistaken for unindexed rows.
+    """
+    signature = minhash(set(text_features(text).tokens))
+    return lsh_bands(signature) if signature else []
@@ -0,0 +1,257 @@
+from __future__ import annotations
+
+import hashlib
+import io
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import IO
+from urllib.parse import urlsplit
+
+import httpx
+
+from shared.utils.env import env_float, env_int
+
+
+USER_AGENT = "SignalForge/0.1 (+feed fetcher)"
+# Spooled bodies stay in memory up to this size and move to a temporary file beyond it.
+SPOOL_MEMORY_BYTES = 1024 * 1024
+
+
+class BodyTooLarge(Exception):
+    pass
+
+
+@dataclass
+class FetchResult:
+    url: str
+    status: int | None = None
+    body: bytes = b""
+    headers: dict[str, str] = field(default_factory=dict)
+    content_hash: str | None = None
+    elapsed: float = 0.0
+    error: str | None = None
+    # Set instead of body when the fetch was spooled; read it through open_body().
+    body_file: IO[bytes] | None = None
+
+    @property
+    def size(self) -> int:
+        if self.body_file is None:
+            return len(self.body)
+        self.body_file.seek(0, io.SEEK_END)
+        return self.body_file.tell()
+
+    def open_body(self) -> IO[bytes]:
+        """The body as a binary file positioned at its start, without copying a spool."""
+        if self.body_file is None:
+            return io.BytesIO(self.body)
+        self.body_file.seek(0)
+        return self.body_file
+
+    def close(self) -> None:
+        if self.body_file is not None:
+            self.body_file.close()
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and self.status is not None and 200 <= self.status < 300
+
+    @property
+    def not_modified(self) -> bool:
+        return self.error is None and self.status == 304
+
+
+@dataclass
+class FetchStats:
+    fetched: int = 0
+    not_modified: int = 0
+    failed: int = 0
+    bytes: int = 0
+    wall_seconds: float = 0.0
+    fetch_seconds: float = 0.0
+
+    @property
+    def speedup(self) -> float:
+        # Serial time (sum of per-request latency) over the concurrent wall clock.
+        if self.wall_seconds <= 0:
+            return 1.0
+        return self.fetch_seconds / self.wall_seconds
+
+    def as_dict(self) -> dict:
+        return {
+            "fetched": self.fetched,
+            "not_modified": self.not_modified,
+            "failed": self.failed,
+            "bytes": self.bytes,
+            "wall_seconds": round(self.wall_seconds, 3),
+            "fetch_seconds": round(self.fetch_seconds, 3),
+            "speedup": round(self.speedup, 2),
+        }
+
+
+class FeedFetcher:
+    def __init__(
+        self,
+        max_workers: int = 16,
+        per_host_limit: int = 4,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 15.0,
+        max_bytes: int = 5 * 1024 * 1024,
+        spool_max_bytes: int = 200 * 1024 * 1024,
+        client: httpx.Client | None = None,
+    ) -> None:
+        self.max_workers = max(1, max_workers)
+        self.per_host_limit = max(1, per_host_limit)
+        self.max_bytes = max_bytes
+        self.spool_max_bytes = spool_max_bytes
+        self._client = client or httpx.Client(
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+            limits=httpx.Limits(
+                max_connections=self.max_workers,
+                max_keepalive_connections=self.max_workers,
+            ),
+            headers={"User-Agent": USER_AGENT},
+            follow_redirects=True,
+        )
+        self._host_slots: dict[str, threading.BoundedSemaphore] = {}
+        self._host_lock = threading.Lock()
+
+    def _slot(self, url: str) -> threading.BoundedSemaphore:
+        host = urlsplit(url).hostname or ""
+        with self._host_lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = threading.BoundedSemaphore(self.per_host_limit)
+                self._host_slots[host] = slot
+            return slot
+
+    def _copy_body(self, response: httpx.Response, sink, max_bytes: int) -> str:
+        declared = response.headers.get("content-length")
+        if declared and declared.isdigit() and int(declared) > max_bytes:
+            raise BodyTooLarge(f"body exceeds {max_bytes} bytes")
+
+        digest = hashlib.sha256()
+        size = 0
+        for chunk in response.iter_bytes():
+            size += len(chunk)
+            if size > max_bytes:
+                raise BodyTooLarge(f"body exceeds {max_bytes} bytes")
+            sink(chunk)
+            digest.update(chunk)
+        return digest.hexdigest()
+
+    def _read_body(self, response: httpx.Response) -> tuple[bytes, str]:
+        chunks: list[bytes] = []
+        content_hash = self._copy_body(response, chunks.append, self.max_bytes)
+        return b"".join(chunks), content_hash
+
+    def _spool_body(self, response: httpx.Response) -> tuple[IO[bytes], str]:
+        spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MEMORY_BYTES)
+        try:
+            content_hash = self._copy_body(response, spool.write, self.spool_max_bytes)
+        except BaseException:
+            spool.close()
+            raise
+        return spool, content_hash
+
+    def fetch(
+        self, url: str, headers: dict[str, str] | None = None, spool: bool = False
+    ) -> FetchResult:
+        """Fetch one feed; spool=True keeps a large body in a temporary file, not memory.
+
+        Spooled results must be closed by the caller.
+        """
+        result = FetchResult(url=url)
+        started = time.perf_counter()
+        try:
+            with self._slot(url):
+                with self._client.stream("GET", url, headers=headers) as response:
+                    result.status = response.status_code
+                    result.headers = {k.lower(): v for k, v in response.headers.items()}
+                    if response.is_success and spool:
+                        result.body_file, result.content_hash = self._spool_body(response)
+                    elif response.is_success:
+                        result.body, result.content_hash = self._read_body(response)
+                    elif response.status_code >= 400:
+                        result.error = f"HTTP {response.status_code}"
+        except (httpx.HTTPError, BodyTooLarge) as exc:
+            result.close()
+            result.body_file = None
+            result.error = str(exc) or exc.__class__.__name__
+        finally:
+            result.elapsed = time.perf_counter() - started
+        return result
+
+    def fetch_many(
+        self,
+        urls: list[str],
+        headers: list[dict[str, str] | None] | None = None,
+    ) -> tuple[list[FetchResult], FetchStats]:
+        stats = FetchStats()
+        if not urls:
+            return [], stats
+
+        per_url_headers = headers if headers is not None else [None] * len(urls)
+        started = time.perf_counter()
+        workers = min(self.max_workers, len(urls))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="feed-fetch") as pool:
+            results = list(pool.map(self.fetch, urls, per_url_headers))
+        stats.wall_seconds = time.perf_counter() - started
+
+        for result in results:
+            stats.fetch_seconds += result.elapsed
+            if result.ok:
+                stats.fetched += 1
+                stats.bytes += result.size
+            elif result.not_modified:
+                stats.not_modified += 1
+            else:
+                stats.failed += 1
+        return results, stats
+
+    def close(self) -> None:
+        self._client.close()
+
+
+def conditional_headers(cache: dict | None) -> dict[str, str]:
+    headers: dict[str, str] = {}
+    if not cache:
+        return headers
+    if cache.get("etag"):
+        headers["If-None-Match"] = cache["etag"]
+    if cache.get("last_modified"):
+        headers["If-Modified-Since"] = cache["last_modified"]
+    return headers
+
+
+def cache_validators(result: FetchResult, previous: dict | None = None) -> dict:
+    # A 304 carries no body, so the previous content hash stays valid.
+    cache = dict(previous or {})
+    if result.headers.get("etag"):
+        cache["etag"] = result.headers["etag"]
+    if result.headers.get("last-modified"):
+        cache["last_modified"] = result.headers["last-modified"]
+    if result.content_hash:
+        cache["content_hash"] = result.content_hash
+    return cache
+
+
+_fetcher: FeedFetcher | None = None
+_fetcher_lock = threading.Lock()
+
+
+def get_feed_fetcher() -> FeedFetcher:
+    global _fetcher
+    with _fetcher_lock:
+        if _fetcher is None:
+            _fetcher = FeedFetcher(
+                max_workers=env_int("FEED_FETCH_CONCURRENCY", 16),
+                per_host_limit=env_int("FEED_FETCH_PER_HOST", 4),
+                connect_timeout=env_float("FEED_FETCH_CONNECT_TIMEOUT", 5.0),
+                read_timeout=env_float("FEED_FETCH_READ_TIMEOUT", 15.0),
+                max_bytes=env_int("FEED_FETCH_MAX_BYTES", 5 * 1024 * 1024),
+                spool_max_bytes=env_int("FEED_STREAM_MAX_BYTES", 200 * 1024 * 1024),
+            )
+        return _fetcher
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import io
+from collections.abc import Iterator
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import IO
+from xml.etree.ElementTree import Element, ParseError, iterparse
+
+
+ATOM_NS = "{http://www.w3.org/2005/Atom}"
+CONTENT_NS = "{http://purl.org/rss/1.0/modules/content/}"
+DC_NS = "{http://purl.org/dc/elements/1.1/}"
+RDF_NS = "{http://www.w3.org/1999/02/22-rdf-syntax-ns#}"
+RSS1_NS = "{http://purl.org/rss/1.0/}"
+
+_RSS_ITEM_TAGS = {"item", f"{RSS1_NS}item"}
+_ITEM_TAGS = _RSS_ITEM_TAGS | {f"{ATOM_NS}entry"}
+_LANGUAGE_TAGS = {"language", f"{DC_NS}language"}
+
+__all__ = ["ParseError", "feed_type", "iter_entries"]
+
+
+def _text(elem: Element, *tags: str) -> str | None:
+    for tag in tags:
+        child = elem.find(tag)
+        if child is not None and child.text and child.text.strip():
+            return child.text.strip()
+    return None
+
+
+def _parse_date(value: str | None) -> datetime | None:
+    if not value:
+        return None
+    try:
+        parsed = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        try:
+            parsed = datetime.fromisoformat(value)
+        except ValueError:
+            return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+
+def _atom_link(elem: Element) -> str | None:
+    fallback = None
+    for link in elem.findall(f"{ATOM_NS}link"):
+        href = link.get("href")
+        if not href:
+            continue
+        if link.get("rel", "alternate") == "alternate":
+            return href
+        fallback = fallback or href
+    return fallback
+
+
+def _entry(elem: Element) -> dict:
+    if elem.tag == "item":
+        link = _text(elem, "link")
+        summary = _text(elem, "description")
+        content = _text(elem, f"{CONTENT_NS}encoded")
+        published = _parse_date(_text(elem, "pubDate", f"{DC_NS}date"))
+        entry_id = _text(elem, "guid")
+        language = _text(elem, f"{DC_NS}language")
+    elif elem.tag == f"{RSS1_NS}item":
+        link = _text(elem, f"{RSS1_NS}link")
+        summary = _text(elem, f"{RSS1_NS}description")
+        content = _text(elem, f"{CONTENT_NS}encoded")
+        published = _parse_date(_text(elem, f"{DC_NS}date"))
+        entry_id = elem.get(f"{RDF_NS}about") or link
+        language = _text(elem, f"{DC_NS}language")
+    else:
+        link = _atom_link(elem)
+        summary = _text(elem, f"{ATOM_NS}summary")
+        content = _text(elem, f"{ATOM_NS}content")
+        published = _parse_date(_text(elem, f"{ATOM_NS}published", f"{ATOM_NS}updated"))
+        entry_id = _text(elem, f"{ATOM_NS}id")
+        language = elem.get("{http://www.w3.org/XML/1998/namespace}lang")
+
+    # Same keys feedparser exposes, so ingest helpers work on either parser's entries.
+    entry: dict = {
+        "title": _text(elem, "title", f"{ATOM_NS}title", f"{RSS1_NS}title"),
+        "link": link,
+        "id": entry_id,
+        "summary": summary,
+        "content": [{"value": content}] if content else [],
+    }
+    if published:
+        entry["published_parsed"] = published.utctimetuple()
+    if language:
+        entry["language"] = language
+    return entry
+
+
+def iter_entries(body: bytes | IO[bytes]) -> Iterator[dict]:
+    """Yield RSS/RDF/Atom entries one at a time, discarding each element once it is read.
+
+    body may be a binary file, which is read incrementally rather than loaded whole.
+    """
+    source = io.BytesIO(body) if isinstance(body, (bytes, bytearray)) else body
+    feed_language = None
+    in_item = False
+    for event, elem in iterparse(source, events=("start", "end")):
+        if event == "start":
+            in_item = in_item or elem.tag in _ITEM_TAGS
+            continue
+        if elem.tag in _LANGUAGE_TAGS and elem.text and not in_item:
+            feed_language = elem.text.strip()
+        elif elem.tag in _ITEM_TAGS:
+            in_item = False
+            entry = _entry(elem)
+            if feed_language:
+                entry.setdefault("language", feed_language)
+            yield entry
+            elem.clear()
+
+
+def feed_type(body: bytes) -> str | None:
+    """Identify a feed from its root element without parsing the rest of the document."""
+    try:
+        for _, elem in iterparse(io.BytesIO(body), events=("start",)):
+            if elem.tag == "rss":
+                return "rss"
+            if elem.tag == f"{ATOM_NS}feed":
+                return "atom"
+            if elem.tag == f"{RDF_NS}RDF":
+                return "rdf"
+            return None
+    except ParseError:
+        return None
+    return None
@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import tempfile
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Protocol
+from uuid import uuid4
+
+from app.services.llm_client import MAX_OUTPUT_TOKENS, DummyLLM, LLMClient, OpenAIClientLLM
+
+
+@dataclass
+class BatchRequest:
+    custom_id: str
+    prompt: str
+    max_chars: int
+
+
+@dataclass
+class BatchResult:
+    custom_id: str
+    content: str | None = None
+    error: str | None = None
+
+
+def write_batch_file(path: Path, requests: Iterable[BatchRequest]) -> int:
+    """Write requests as JSONL, one {"custom_id", "prompt", "max_chars"} object per line."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    count = 0
+    with path.open("w", encoding="utf-8") as handle:
+        for request in requests:
+            handle.write(json.dumps(request.__dict__) + "\n")
+            count += 1
+    return count
+
+
+def read_batch_file(path: Path) -> Iterator[BatchRequest]:
+    with path.open(encoding="utf-8") as handle:
+        for line in handle:
+            if line.strip():
+                yield BatchRequest(**json.loads(line))
+
+
+class BatchProvider(Protocol):
+    name: str
+
+    def submit(self, path: Path) -> str:
+        ...
+
+    def status(self, batch_id: str) -> str:
+        """One of "in_progress", "completed" or "failed"."""
+        ...
+
+    def results(self, batch_id: str) -> Iterator[BatchResult]:
+        ...
+
+
+class LocalBatchProvider:
+    """File-based stand-in that answers a batch with a local LLMClient when first polled."""
+
+    name = "local"
+
+    def __init__(self, root: str, llm: LLMClient | None = None) -> None:
+        self.root = Path(root)
+        self.llm = llm or DummyLLM()
+
+    def _dir(self, batch_id: str) -> Path:
+        return self.root / batch_id
+
+    def submit(self, path: Path) -> str:
+        batch_id = uuid4().hex
+        self._dir(batch_id).mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(path, self._dir(batch_id) / "input.jsonl")
+        return batch_id
+
+    def status(self, batch_id: str) -> str:
+        batch_dir = self._dir(batch_id)
+        if (batch_dir / "output.jsonl").exists():
+            return "completed"
+        if not (batch_dir / "input.jsonl").exists():
+            return "failed"
+        with tempfile.NamedTemporaryFile(
+            "w", dir=batch_dir, encoding="utf-8", delete=False
+        ) as handle:
+            for request in read_batch_file(batch_dir / "input.jsonl"):
+                try:
+                    result = BatchResult(
+                        request.custom_id, self.llm.generate(request.prompt, request.max_chars)
+                    )
+                except Exception as exc:
+                    result = BatchResult(request.custom_id, error=str(exc))
+                handle.write(json.dumps(result.__dict__) + "\n")
+        os.replace(handle.name, batch_dir / "output.jsonl")
+        return "completed"
+
+    def results(self, batch_id: str) -> Iterator[BatchResult]:
+        with (self._dir(batch_id) / "output.jsonl").open(encoding="utf-8") as handle:
+            for line in handle:
+                if line.strip():
+                    yield BatchResult(**json.loads(line))
+
+
+class OpenAIBatchProvider:
+    name = "openai"
+
+    _FAILED = {"failed", "expired", "cancelled"}
+
+    def __init__(self, llm: OpenAIClientLLM | None = None) -> None:
+        self.llm = llm or OpenAIClientLLM()
+
+    def submit(self, path: Path) -> str:
+        upload = path.with_suffix(".openai.jsonl")
+        with upload.open("w", encoding="utf-8") as handle:
+            for request in read_batch_file(path):
+                line = {
+                    "custom_id": request.custom_id,
+                    "method": "POST",
+                    "url": "/v1/responses",
+                    "body": {
+                        "model": self.llm.model,
+                        "input": request.prompt,
+                        "max_output_tokens": MAX_OUTPUT_TOKENS,
+                    },
+                }
+                handle.write(json.dumps(line) + "\n")
+        client = self.llm.get_client()
+        with upload.open("rb") as handle:
+            uploaded = client.files.create(file=handle, purpose="batch")
+        batch = client.batches.create(
+            input_file_id=uploaded.id, endpoint="/v1/responses", completion_window="24h"
+        )
+        return batch.id
+
+    def status(self, batch_id: str) -> str:
+        batch = self.llm.get_client().batches.retrieve(batch_id)
+        if batch.status == "completed":
+            return "completed"
+        if batch.status in self._FAILED:
+            return "failed"
+        return "in_progress"
+
+    def results(self, batch_id: str) -> Iterator[BatchResult]:
+        client = self.llm.get_client()
+        batch = client.batches.retrieve(batch_id)
+        if batch.output_file_id:
+            for line in client.files.content(batch.output_file_id).text.splitlines():
+                if not line.strip():
+                    continue
+                item = json.loads(line)
+                response = item.get("response") or {}
+                if item.get("error") or response.get("status_code") != 200:
+                    error = item.get("error") or (response.get("body") or {}).get("error")
+                    yield BatchResult(
+                        item["custom_id"],
+                        error=json.dumps(error) if error else f"HTTP {response.get('status_code')}",
+                    )
+                    continue
+                texts = [
+                    part.get("text", "")
+                    for output in response.get("body", {}).get("output", [])
+                    for part in output.get("content") or []
+                    if part.get("type") == "output_text"
+                ]
+                yield BatchResult(item["custom_id"], "".join(texts))
+        if batch.error_file_id:
+            for line in client.files.content(batch.error_file_id).text.splitlines():
+                if line.strip():
+                    item = json.loads(line)
+                    error = json.dumps(item.get("error") or "failed")
+                    yield BatchResult(item["custom_id"], error=error)
+
+
+def batch_dir() -> Path:
+    return Path(os.getenv("LLM_BATCH_DIR", "/var/lib/signalforge/batches"))
+
+
+def get_batch_provider(name: str | None = None) -> BatchProvider:
+    name = (name or os.getenv("LLM_BATCH_PROVIDER", "local")).lower()
+    if name == "openai":
+        return OpenAIBatchProvider()
+    if name == "local":
+        return LocalBatchProvider(str(batch_dir() / "local"))
+    raise ValueError(f"Unknown LLM batch provider: {name}")
@@ -0,0 +1,230 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Protocol
+
+from app.core.config import settings
+from shared.utils.env import env_float, env_int
+
+
+CHARS_PER_TOKEN = 4
+BUCKET_TTL_SECONDS = 120
+
+_current_workspace: ContextVar[str | None] = ContextVar("llm_workspace", default=None)
+
+# Refills every bucket by elapsed time, then takes from all of them only if all can pay.
+_TAKE_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local wait = 0
+local levels = {}
+for i, key in ipairs(KEYS) do
+  local capacity = tonumber(ARGV[2 * i - 1])
+  local cost = tonumber(ARGV[2 * i])
+  local state = redis.call('HMGET', key, 'level', 'ts')
+  local level = tonumber(state[1]) or capacity
+  local ts = tonumber(state[2]) or now
+  level = math.min(capacity, level + (now - ts) * capacity / 60)
+  levels[i] = level
+  if level < cost then
+    wait = math.max(wait, (cost - level) * 60 / capacity)
+  end
+end
+if wait > 0 then
+  return tostring(wait)
+end
+for i, key in ipairs(KEYS) do
+  redis.call('HSET', key, 'level', tostring(levels[i] - tonumber(ARGV[2 * i])), 'ts', tostring(now))
+  redis.call('EXPIRE', key, ARGV[#ARGV])
+end
+return '0'
+"""
+
+
+class BucketStore(Protocol):
+    def take(self, buckets: list[tuple[str, float, float]]) -> float:
+        """Take cost from every (key, per-minute capacity, cost) bucket, or none of them.
+
+        Returns 0 when granted, otherwise the seconds until all buckets could pay.
+        """
+        ...
+
+
+class LocalBucketStore:
+    """In-process buckets, for tests and single-worker setups."""
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic) -> None:
+        self.clock = clock
+        self._levels: dict[str, tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def take(self, buckets: list[tuple[str, float, float]]) -> float:
+        with self._lock:
+            now = self.clock()
+            levels = []
+            wait = 0.0
+            for key, capacity, cost in buckets:
+                level, stamp = self._levels.get(key, (capacity, now))
+                level = min(capacity, level + (now - stamp) * capacity / 60)
+                levels.append(level)
+                if level < cost:
+                    wait = max(wait, (cost - level) * 60 / capacity)
+            if wait > 0:
+                return wait
+            for (key, _, cost), level in zip(buckets, levels):
+                self._levels[key] = (level - cost, now)
+            return 0.0
+
+
+class RedisBucketStore:
+    """Buckets shared by every worker, updated atomically by a Lua script."""
+
+    def __init__(self, client=None) -> None:
+        if client is None:
+            import redis
+
+            client = redis.Redis.from_url(settings.redis_url)
+        self.client = client
+        self._script = client.register_script(_TAKE_SCRIPT)
+
+    def take(self, buckets: list[tuple[str, float, float]]) -> float:
+        args: list[float] = []
+        for _, capacity, cost in buckets:
+            args.extend([capacity, cost])
+        args.append(BUCKET_TTL_SECONDS)
+        return float(self._script(keys=[key for key, _, _ in buckets], args=args))
+
+
+class LLMBudget:
+    """Requests- and tokens-per-minute limits, overall and per workspace."""
+
+    def __init__(
+        self,
+        store: BucketStore,
+        rpm: int = 0,
+        tpm: int = 0,
+        workspace_rpm: int = 0,
+        workspace_tpm: int = 0,
+        max_wait: float = 60.0,
+        prefix: str = "signalforge:llm:budget",
+    ) -> None:
+        self.store = store
+        self.rpm = rpm
+        self.tpm = tpm
+        self.workspace_rpm = workspace_rpm
+        self.workspace_tpm = workspace_tpm
+        self.max_wait = max_wait
+        self.prefix = prefix
+
+    def _buckets(self, tokens: int, workspace_id: str | None) -> list[tuple[str, float, float]]:
+        limits = [("rpm", self.rpm, 1), ("tpm", self.tpm, tokens)]
+        buckets = [(f"{self.prefix}:{name}", limit, cost) for name, limit, cost in limits if limit]
+        if workspace_id:
+            limits = [("rpm", self.workspace_rpm, 1), ("tpm", self.workspace_tpm, tokens)]
+            buckets.extend(
+                (f"{self.prefix}:ws:{workspace_id}:{name}", limit, cost)
+                for name, limit, cost in limits
+                if limit
+            )
+        # A single call bigger than a whole minute's budget waits for a full bucket.
+        return [(key, float(limit), float(min(cost, limit))) for key, limit, cost in buckets]
+
+    def try_acquire(self, tokens: int, workspace_id: str | None = None) -> float:
+        buckets = self._buckets(tokens, workspace_id)
+        if not buckets:
+            return 0.0
+        return self.store.take(buckets)
+
+    def acquire(self, tokens: int, workspace_id: str | None = None) -> None:
+        """Block until the call fits every budget, or raise after max_wait seconds."""
+        deadline = time.monotonic() + self.max_wait
+        while True:
+            wait = self.try_acquire(tokens, workspace_id)
+            if wait <= 0:
+                return
+            if time.monotonic() + wait > deadline:
+                raise RuntimeError("LLM budget exhausted")
+            time.sleep(wait)
+
+
+def estimate_tokens(prompt: str, max_output_tokens: int) -> int:
+    return len(prompt) // CHARS_PER_TOKEN + max_output_tokens
+
+
+class BudgetedLLM:
+    """LLMClient wrapper that waits for budget before every upstream call.
+
+    Token cost is estimated up front from the prompt length and the output cap.
+    """
+
+    def __init__(
+        self, inner, budget: LLMBudget, output_tokens: int, multi_output_tokens: int
+    ) -> None:
+        self.inner = inner
+        self.budget = budget
+        self.model = getattr(inner, "model", None)
+        self.output_tokens = output_tokens
+        self.multi_output_tokens = multi_output_tokens
+
+    def generate(self, prompt: str, max_chars: int) -> str:
+        self.budget.acquire(estimate_tokens(prompt, self.output_tokens), current_workspace())
+        return self.inner.generate(prompt, max_chars=max_chars)
+
+    def generate_many(self, prompt: str, budgets: dict[str, int]) -> dict[str, str]:
+        self.budget.acquire(estimate_tokens(prompt, self.multi_output_tokens), current_workspace())
+        return self.inner.generate_many(prompt, budgets)
+
+    def stream(self, prompt: str) -> Iterator[str]:
+        self.budget.acquire(estimate_tokens(prompt, self.output_tokens), current_workspace())
+        return self.inner.stream(prompt)
+
+
+def budget_reserver(
+    budget: LLMBudget, output_tokens: int, multi_output_tokens: int
+) -> Callable[[str, str], bool]:
+    """Non-blocking charge for extra upstream calls, such as hedges.
+
+    The returned reserve(kind, prompt) takes budget only if it is free right now.
+    """
+
+    def reserve(kind: str, prompt: str) -> bool:
+        tokens = multi_output_tokens if kind == "generate_many" else output_tokens
+        return budget.try_acquire(estimate_tokens(prompt, tokens), current_workspace()) <= 0
+
+    return reserve
+
+
+@contextmanager
+def llm_workspace(workspace_id) -> Iterator[None]:
+    """Charge LLM calls made inside the block to a workspace's sub-budget."""
+    token = _current_workspace.set(str(workspace_id) if workspace_id else None)
+    try:
+        yield
+    finally:
+        _current_workspace.reset(token)
+
+
+def current_workspace() -> str | None:
+    return _current_workspace.get()
+
+
+def get_llm_budget() -> LLMBudget | None:
+    """Budget from LLM_RPM/LLM_TPM and the LLM_WORKSPACE_* sub-limits; None if all are unset."""
+    limits = {
+        "rpm": env_int("LLM_RPM"),
+        "tpm": env_int("LLM_TPM"),
+        "workspace_rpm": env_int("LLM_WORKSPACE_RPM"),
+        "workspace_tpm": env_int("LLM_WORKSPACE_TPM"),
+    }
+    if not any(limits.values()):
+        return None
+    if os.getenv("LLM_BUDGET_BACKEND", "redis").lower() == "local":
+        store: BucketStore = LocalBucketStore()
+    else:
+        store = RedisBucketStore()
+    return LLMBudget(store, max_wait=env_float("LLM_BUDGET_MAX_WAIT_SECONDS", 60.0), **limits)
@@ -0,0 +1,296 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections.abc import Callable, Iterator
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Protocol
+
+from app.core.config import settings
+from shared.utils.env import env_int
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL_SECONDS = 7 * 24 * 60 * 60
+DEFAULT_MAX_ENTRIES = 100_000
+DEFAULT_SQLITE_PATH = "/var/lib/signalforge/cache/llm_cache.sqlite3"
+LOCK_TTL_SECONDS = 120
+LOCK_POLL_SECONDS = 0.1
+
+# Deletes the lock only if it still holds the caller's token.
+_RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+  return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class ResponseStore(Protocol):
+    def get(self, key: str) -> str | None:
+        ...
+
+    def set(self, key: str, value: str) -> None:
+        ...
+
+    def acquire(self, key: str) -> str | None:
+        """Take the fill lock for key; returns an owner token, or None if someone holds it."""
+        ...
+
+    def release(self, key: str, token: str) -> None:
+        """Drop the fill lock, but only if token still owns it."""
+        ...
+
+
+class RedisResponseStore:
+    """Responses shared by every worker, each kept for the TTL."""
+
+    def __init__(
+        self, ttl: int, prefix: str = "signalforge:llm", client=None, url: str | None = None
+    ) -> None:
+        self.ttl = ttl
+        self.prefix = prefix
+        if client is None:
+            import redis
+
+            client = redis.Redis.from_url(url or settings.redis_url)
+        self.client = client
+        self._release = client.register_script(_RELEASE_SCRIPT)
+
+    def get(self, key: str) -> str | None:
+        value = self.client.get(f"{self.prefix}:response:{key}")
+        return value.decode("utf-8") if isinstance(value, bytes) else value
+
+    def set(self, key: str, value: str) -> None:
+        self.client.set(f"{self.prefix}:response:{key}", value, ex=self.ttl)
+
+    def acquire(self, key: str) -> str | None:
+        token = uuid.uuid4().hex
+        if self.client.set(f"{self.prefix}:lock:{key}", token, nx=True, ex=LOCK_TTL_SECONDS):
+            return token
+        return None
+
+    def release(self, key: str, token: str) -> None:
+        self._release(keys=[f"{self.prefix}:lock:{key}"], args=[token])
+
+
+class SQLiteResponseStore:
+    """Host-local cache file with TTL expiry and least-recently-used eviction."""
+
+    def __init__(self, path: str, ttl: int, max_entries: int = DEFAULT_MAX_ENTRIES) -> None:
+        self.ttl = ttl
+        self.max_entries = max_entries
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+            "expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_responses_accessed_at ON responses (accessed_at)"
+        )
+
+    def get(self, key: str) -> str | None:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] <= now:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            return row[0]
+
+    def set(self, key: str, value: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, expires_at, accessed_at) "
+                "VALUES (?, ?, ?, ?)",
+                (key, value, now + self.ttl, now),
+            )
+            self._conn.execute("DELETE FROM responses WHERE expires_at <= ?", (now,))
+            self._conn.execute(
+                "DELETE FROM responses WHERE key IN ("
+                "SELECT key FROM responses ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    def acquire(self, key: str) -> str | None:
+        # CachedLLM already coalesces identical requests within the process.
+        return "local"
+
+    def release(self, key: str, token: str) -> None:
+        return None
+
+
+class CachedLLM:
+    """LLMClient wrapper that serves repeated rendered prompts from a ResponseStore.
+
+    Identical concurrent requests are coalesced: one caller goes upstream and the
+    rest wait for its answer, within the process and (on Redis) across workers.
+    """
+
+    def __init__(self, inner, store: ResponseStore, model: str | None = None) -> None:
+        self.inner = inner
+        self.store = store
+        self.model = model or getattr(inner, "model", None) or type(inner).__name__
+        self._inflight: dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._metrics = {"hits": 0, "misses": 0, "coalesced": 0, "errors": 0}
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._metrics[name] += 1
+
+    def metrics(self) -> dict:
+        with self._lock:
+            return dict(self._metrics)
+
+    def cache_key(self, prompt: str, budget: int | dict[str, int]) -> str:
+        if isinstance(budget, dict):
+            budget = json.dumps(budget, sort_keys=True)
+        payload = f"{self.model}\x00{budget}\x00{prompt}"
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _cached(self, key: str) -> str | None:
+        try:
+            return self.store.get(key)
+        except Exception as exc:
+            self._count("errors")
+            logger.warning("LLM cache unavailable", extra={"error": str(exc)})
+            return None
+
+    def _store(self, key: str, value: str) -> None:
+        if not value:
+            # Empty answers are skipped downstream; leave them uncached so a rerun retries.
+            return
+        try:
+            self.store.set(key, value)
+        except Exception as exc:
+            self._count("errors")
+            logger.warning("LLM cache unavailable", extra={"error": str(exc)})
+
+    def _acquire(self, key: str) -> tuple[str | None, bool]:
+        """(token, store_ok); store_ok is False when the store could not be asked."""
+        try:
+            return self.store.acquire(key), True
+        except Exception as exc:
+            self._count("errors")
+            logger.warning("LLM cache unavailable", extra={"error": str(exc)})
+            return None, False
+
+    def _wait_for_peer(self, key: str) -> tuple[str | None, str | None]:
+        """Poll until the leader's answer lands or its lock frees up.
+
+        Returns (value, token): the cached value, or the lock token if this caller
+        took the lock over. Both are None when waiting timed out.
+        """
+        deadline = time.monotonic() + LOCK_TTL_SECONDS
+        while time.monotonic() < deadline:
+            time.sleep(LOCK_POLL_SECONDS)
+            value = self._cached(key)
+            if value is not None:
+                return value, None
+            token, ok = self._acquire(key)
+            if token is not None or not ok:
+                return None, token
+        return None, None
+
+    def _fill(self, key: str, produce: Callable[[], str]) -> str:
+        token, ok = self._acquire(key)
+        if token is None and ok:
+            value, token = self._wait_for_peer(key)
+            if value is not None:
+                self._count("coalesced")
+                return value
+        try:
+            self._count("misses")
+            value = produce()
+            self._store(key, value)
+            return value
+        finally:
+            # Only the lock's owner releases it; a follower that gave up waiting must not.
+            if token is not None:
+                try:
+                    self.store.release(key, token)
+                except Exception:
+                    pass
+
+    def generate(self, prompt: str, max_chars: int) -> str:
+        return self._through_cache(
+            self.cache_key(prompt, max_chars),
+            lambda: self.inner.generate(prompt, max_chars=max_chars),
+        )
+
+    def generate_many(self, prompt: str, budgets: dict[str, int]) -> dict[str, str]:
+        def produce() -> str:
+            formats = self.inner.generate_many(prompt, budgets)
+            return json.dumps(formats) if formats else ""
+
+        value = self._through_cache(self.cache_key(prompt, budgets), produce)
+        return json.loads(value) if value else {}
+
+    def stream(self, prompt: str) -> Iterator[str]:
+        # Partial streams are not cached; generate() caches the finished text.
+        return self.inner.stream(prompt)
+
+    def _through_cache(self, key: str, produce: Callable[[], str]) -> str:
+        value = self._cached(key)
+        if value is not None:
+            self._count("hits")
+            return value
+
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[key] = future
+        if not leader:
+            self._count("coalesced")
+            return future.result()
+
+        try:
+            value = self._fill(key, produce)
+            future.set_result(value)
+            return value
+        except Exception as exc:
+            future.set_exception(exc)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+
+def get_response_store() -> ResponseStore | None:
+    backend = os.getenv("LLM_CACHE_BACKEND", "redis").lower()
+    if backend in {"", "none", "off"}:
+        return None
+    ttl = env_int("LLM_CACHE_TTL_SECONDS", DEFAULT_TTL_SECONDS)
+    if backend == "sqlite":
+        path = os.getenv("LLM_CACHE_PATH") or DEFAULT_SQLITE_PATH
+        max_entries = env_int("LLM_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES)
+        return SQLiteResponseStore(path, ttl, max_entries)
+    # A dedicated instance can evict freely; on the shared REDIS_URL (broker, budget,
+    # idea filter) only volatile-lru is safe, since every cache entry has a TTL.
+    return RedisResponseStore(ttl, url=os.getenv("LLM_CACHE_REDIS_URL") or None)
+
+
+def cache_metrics(llm) -> dict | None:
+    metrics = getattr(llm, "metrics", None)
+    return metrics() if callable(metrics) else None
@@ -1,16 +1,41 @@
 from __future__ import annotations
 
 import hashlib
+import json
 import os
+import re
+import threading
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Protocol
+from typing import Protocol, TypeVar
+
+from app.services.llm_budget import BudgetedLLM, budget_reserver, get_llm_budget
+from app.services.llm_cache import CachedLLM, get_response_store
+from app.services.llm_hedge import HedgedLLM, hedge_settings
+from shared.utils.env import env_int
+
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+MAX_OUTPUT_TOKENS = 256
+MULTI_FORMAT_MAX_TOKENS = 1200
 
 
 class LLMClient(Protocol):
     def generate(self, prompt: str, max_chars: int) -> str:
         ...
 
+    def generate_many(self, prompt: str, budgets: dict[str, int]) -> dict[str, str]:
+        """Answer a multi-format prompt in one call; budgets maps format to max chars."""
+        ...
+
+    def stream(self, prompt: str) -> Iterator[str]:
+        """Yield text as it arrives; closing the iterator abandons the request."""
+        ...
+
 
 def _find_shared_dir() -> Path:
     current = Path(__file__).resolve()
@@ -31,44 +56,229 @@ def render_prompt(template: str, **kwargs: str) -> str:
     return template.format(**kwargs)
 
 
+SENTENCE_END = re.compile(r"[.!?](?=\s|$)")
+# A sentence boundary this far into the budget beats a later word boundary.
+MIN_SENTENCE_FRACTION = 0.6
+
+
+def cut_at_boundary(text: str, max_chars: int) -> str:
+    """Trim text to max_chars, preferring to end on a sentence, then on a word."""
+    text = text.strip()
+    if len(text) <= max_chars:
+        return text
+    window = text[: max_chars + 1]
+    sentence_ends = [
+        match.end() for match in SENTENCE_END.finditer(window) if match.end() <= max_chars
+    ]
+    if sentence_ends and sentence_ends[-1] >= max_chars * MIN_SENTENCE_FRACTION:
+        return window[: sentence_ends[-1]].strip()
+    space = window.rfind(" ")
+    if space > 0:
+        return window[:space].strip()
+    return text[:max_chars].strip()
+
+
+def read_until_budget(chunks: Iterator[str], max_chars: int) -> str:
+    """Consume streamed text only until it passes max_chars, then close the stream."""
+    text = ""
+    try:
+        for chunk in chunks:
+            text += chunk
+            if len(text) > max_chars:
+                break
+    finally:
+        close = getattr(chunks, "close", None)
+        if close:
+            close()
+    return cut_at_boundary(text, max_chars)
+
+
+def parse_formats(text: str, budgets: dict[str, int]) -> dict[str, str]:
+    """Pull each budgeted format out of a JSON object reply.
+
+    A list value is a thread and comes back as numbered lines, one tweet each.
+    """
+    start, end = text.find("{"), text.rfind("}")
+    if start < 0 or end <= start:
+        return {}
+    try:
+        data = json.loads(text[start : end + 1])
+    except ValueError:
+        return {}
+    if not isinstance(data, dict):
+        return {}
+
+    parsed: dict[str, str] = {}
+    for key, max_chars in budgets.items():
+        value = data.get(key)
+        if isinstance(value, list):
+            tweets = [str(tweet).strip()[:max_chars].strip() for tweet in value]
+            tweets = [tweet for tweet in tweets if tweet]
+            if tweets:
+                parsed[key] = "\n".join(f"{i}. {tweet}" for i, tweet in enumerate(tweets, 1))
+        elif isinstance(value, str) and value.strip():
+            parsed[key] = value.strip()[:max_chars].strip()
+    return parsed
+
+
 @dataclass
 class DummyLLM:
     seed: str = "signalforge"
 
     def generate(self, prompt: str, max_chars: int) -> str:
+        return read_until_budget(self.stream(prompt), max_chars)
+
+    def stream(self, prompt: str) -> Iterator[str]:
         digest = hashlib.sha256((self.seed + prompt).encode("utf-8")).hexdigest()
         body = (
             "SignalForge draft: "
             "A concise, original insight derived from sources. "
             f"Ref {digest[:24]}."
         )
-        return body[:max_chars].strip()
+        for word in body.split(" "):
+            yield word + " "
+
+    def generate_many(self, prompt: str, budgets: dict[str, int]) -> dict[str, str]:
+        return {
+            key: self.generate(f"{key}\n{prompt}", max_chars) for key, max_chars in budgets.items()
+        }
+
+
+STREAM_FAILURE_EVENTS = {"response.failed", "response.incomplete", "error"}
+
+
+def _raise_stream_failure(event) -> None:
+    """Fail a stream that ended badly, so a partial reply is neither cached nor kept."""
+    response = getattr(event, "response", None)
+    details = getattr(response, "incomplete_details", None)
+    reason = getattr(details, "reason", None)
+    if event.type == "response.incomplete" and reason == "max_output_tokens":
+        # Running into the output cap is expected; callers trim to their budget anyway.
+        return
+    error = getattr(event, "error", None) or getattr(response, "error", None)
+    message = getattr(error, "message", None) or getattr(event, "message", None) or reason
+    raise RuntimeError(f"LLM stream {event.type}: {message or 'no details'}")
 
 
 class OpenAIClientLLM:
     def __init__(self, api_key: str | None = None, model: str = "gpt-4o-mini") -> None:
         self.api_key = api_key or os.getenv("OPENAI_API_KEY")
         self.model = model
+        self._client = None
+        self._client_lock = threading.Lock()
+
+    def get_client(self):
+        # One client, and so one HTTP connection pool, shared by every call and thread.
+        with self._client_lock:
+            if self._client is None:
+                if not self.api_key:
+                    raise RuntimeError("OPENAI_API_KEY not set")
+                try:
+                    from openai import OpenAI
+                except ImportError as exc:
+                    raise RuntimeError("openai package not installed") from exc
+                self._client = OpenAI(api_key=self.api_key)
+            return self._client
 
     def generate(self, prompt: str, max_chars: int) -> str:
-        if not self.api_key:
-            raise RuntimeError("OPENAI_API_KEY not set")
+        # Stop reading once the budget is covered instead of paying for the full reply.
+        return read_until_budget(self.stream(prompt), max_chars)
+
+    def stream(self, prompt: str) -> Iterator[str]:
+        client = self.get_client()
+        events = client.responses.create(
+            model=self.model,
+            input=prompt,
+            max_output_tokens=MAX_OUTPUT_TOKENS,
+            stream=True,
+        )
         try:
-            from openai import OpenAI
-        except ImportError as exc:
-            raise RuntimeError("openai package not installed") from exc
+            for event in events:
+                if event.type == "response.output_text.delta":
+                    yield event.delta
+                elif event.type in STREAM_FAILURE_EVENTS:
+                    _raise_stream_failure(event)
+        finally:
+            events.close()
 
-        client = OpenAI(api_key=self.api_key)
+    def generate_many(self, prompt: str, budgets: dict[str, int]) -> dict[str, str]:
+        client = self.get_client()
         response = client.responses.create(
             model=self.model,
             input=prompt,
-            max_output_tokens=256,
+            max_output_tokens=MULTI_FORMAT_MAX_TOKENS,
+            text={"format": {"type": "json_object"}},
         )
-        text = response.output_text or ""
-        return text[:max_chars].strip()
+        return parse_formats(response.output_text or "", budgets)
+
+
+_llm: LLMClient | None = None
+_llm_lock = threading.Lock()
 
 
 def get_llm() -> LLMClient:
-    if os.getenv("OPENAI_API_KEY"):
-        return OpenAIClientLLM()
-    return DummyLLM()
+    global _llm
+    with _llm_lock:
+        if _llm is None:
+            if os.getenv("OPENAI_API_KEY"):
+                llm: LLMClient = OpenAIClientLLM()
+                budget = get_llm_budget()
+                # Inside the budget, so budget waits never count as upstream latency;
+                # hedges are charged without waiting and skipped when none is free.
+                hedging = hedge_settings()
+                if hedging is not None:
+                    reserve = None
+                    if budget is not None:
+                        reserve = budget_reserver(
+                            budget, MAX_OUTPUT_TOKENS, MULTI_FORMAT_MAX_TOKENS
+                        )
+                    llm = HedgedLLM(
+                        llm, max_workers=2 * llm_concurrency(), reserve=reserve, **hedging
+                    )
+                if budget is not None:
+                    llm = BudgetedLLM(llm, budget, MAX_OUTPUT_TOKENS, MULTI_FORMAT_MAX_TOKENS)
+                # Outermost, so cache hits never spend budget.
+                store = get_response_store()
+                if store is not None:
+                    llm = CachedLLM(llm, store)
+                _llm = llm
+            else:
+                _llm = DummyLLM()
+        return _llm
+
+
+def llm_concurrency() -> int:
+    return max(1, env_int("LLM_CONCURRENCY", 8))
+
+
+def map_concurrently(
+    call: Callable[[T], R], items: list[T], concurrency: int | None = None
+) -> list[R | Exception]:
+    """Apply call to items on a bounded pool.
+
+    Results come back in item order; a failed call yields its exception
+    instead of failing the others.
+    """
+
+    def isolated(item: T) -> R | Exception:
+        try:
+            return call(item)
+        except Exception as exc:
+            return exc
+
+    if not items:
+        return []
+    workers = min(concurrency or llm_concurrency(), len(items))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(isolated, items))
+
+
+def generate_concurrently(
+    llm: LLMClient,
+    requests: list[tuple[str, int]],
+    concurrency: int | None = None,
+) -> list[str | Exception]:
+    """Run (prompt, max_chars) requests through map_concurrently."""
+    return map_concurrently(
+        lambda request: llm.generate(request[0], max_chars=request[1]), requests, concurrency
+    )
@@ -0,0 +1,233 @@
+from __future__ import annotations
+
+import contextvars
+import math
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from concurrent.futures import TimeoutError as FutureTimeout
+from typing import TypeVar
+
+from shared.utils.env import env_float, env_int
+
+
+T = TypeVar("T")
+
+DEFAULT_WINDOW = 500
+DEFAULT_MIN_SAMPLES = 50
+DEFAULT_MAX_RATIO = 0.05
+
+
+class LatencyHistogram:
+    """Latencies of the most recent successful calls."""
+
+    def __init__(self, window: int = DEFAULT_WINDOW) -> None:
+        self._samples: deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, pct: float) -> float | None:
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        index = min(len(samples) - 1, max(0, math.ceil(pct / 100 * len(samples)) - 1))
+        return samples[index]
+
+
+def _discard(future: Future, discard: Callable) -> None:
+    if future.exception() is None:
+        discard(future.result())
+
+
+def _close(chunks) -> None:
+    close = getattr(chunks, "close", None)
+    if callable(close):
+        close()
+
+
+class HedgedLLM:
+    """LLMClient wrapper that races a duplicate request against slow ones.
+
+    A call still running after the given percentile of recent latency for its
+    kind of request gets a second, identical upstream call, and whichever
+    answers first wins. At most max_ratio of recent calls are hedged, so the
+    extra cost stays bounded. Streams hedge on time to the first chunk.
+
+    Sits inside the budget, so latency is upstream time only; each hedge is
+    charged through reserve(kind, prompt) and skipped when no budget is free.
+    """
+
+    def __init__(
+        self,
+        inner,
+        percentile: float = 95.0,
+        max_ratio: float = DEFAULT_MAX_RATIO,
+        window: int = DEFAULT_WINDOW,
+        min_samples: int = DEFAULT_MIN_SAMPLES,
+        max_workers: int = 16,
+        reserve: Callable[[str, str], bool] | None = None,
+    ) -> None:
+        self.inner = inner
+        self.reserve = reserve
+        self.model = getattr(inner, "model", None)
+        self.percentile = percentile
+        self.max_ratio = max_ratio
+        self.window = window
+        self.min_samples = min_samples
+        self._histograms: dict[str, LatencyHistogram] = {}
+        self._recent: deque[bool] = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="llm-hedge")
+        self._metrics = {
+            "requests": 0,
+            "hedged": 0,
+            "hedge_wins": 0,
+            "budget_skipped": 0,
+            "saved_seconds": 0.0,
+        }
+
+    def metrics(self) -> dict:
+        with self._lock:
+            return dict(self._metrics)
+
+    def _count(self, name: str, amount: float = 1) -> None:
+        with self._lock:
+            self._metrics[name] += amount
+
+    def histogram(self, kind: str) -> LatencyHistogram:
+        with self._lock:
+            if kind not in self._histograms:
+                self._histograms[kind] = LatencyHistogram(self.window)
+            return self._histograms[kind]
+
+    def threshold(self, kind: str) -> float | None:
+        """Seconds after which a call of this kind is hedged, or None while warming up."""
+        histogram = self.histogram(kind)
+        if len(histogram) < self.min_samples:
+            return None
+        return histogram.percentile(self.percentile)
+
+    def _admit(self, hedge: bool) -> bool:
+        with self._lock:
+            if hedge:
+                hedge = sum(self._recent) + 1 <= self.max_ratio * (len(self._recent) + 1)
+            self._recent.append(hedge)
+            return hedge
+
+    def _submit(self, kind: str, call: Callable[[], T]) -> Future:
+        # Pool threads do not inherit the caller's context (e.g. llm_workspace).
+        return self._pool.submit(contextvars.copy_context().run, self._timed, kind, call)
+
+    def _timed(self, kind: str, call: Callable[[], T]) -> T:
+        started = time.monotonic()
+        value = call()
+        self.histogram(kind).record(time.monotonic() - started)
+        return value
+
+    def _race(
+        self,
+        kind: str,
+        prompt: str,
+        call: Callable[[], T],
+        discard: Callable[[T], None] | None = None,
+    ) -> T:
+        self._count("requests")
+        threshold = self.threshold(kind)
+        primary = self._submit(kind, call)
+        if threshold is None:
+            self._admit(False)
+            return primary.result()
+        try:
+            value = primary.result(timeout=threshold)
+        except FutureTimeout:
+            pass
+        else:
+            self._admit(False)
+            return value
+        if not self._admit(True):
+            return primary.result()
+        if self.reserve is not None and not self.reserve(kind, prompt):
+            self._count("budget_skipped")
+            return primary.result()
+
+        self._count("hedged")
+        hedge = self._submit(kind, call)
+        for future in as_completed([primary, hedge]):
+            if future.exception() is not None:
+                continue
+            loser = hedge if future is primary else primary
+            if future is hedge:
+                self._count("hedge_wins")
+                won_at = time.monotonic()
+                loser.add_done_callback(lambda done: self._primary_finished(done, won_at))
+            if discard is not None:
+                loser.add_done_callback(lambda done: _discard(done, discard))
+            return future.result()
+        return primary.result()
+
+    def _primary_finished(self, primary: Future, won_at: float) -> None:
+        if primary.exception() is None:
+            self._count("saved_seconds", time.monotonic() - won_at)
+
+    def generate(self, prompt: str, max_chars: int) -> str:
+        return self._race(
+            "generate", prompt, lambda: self.inner.generate(prompt, max_chars=max_chars)
+        )
+
+    def generate_many(self, prompt: str, budgets: dict[str, int]) -> dict[str, str]:
+        return self._race(
+            "generate_many", prompt, lambda: self.inner.generate_many(prompt, budgets)
+        )
+
+    def stream(self, prompt: str) -> Iterator[str]:
+        def start() -> tuple[Iterator[str], str | None]:
+            chunks = iter(self.inner.stream(prompt))
+            return chunks, next(chunks, None)
+
+        chunks, first = self._race(
+            "stream", prompt, start, discard=lambda opened: _close(opened[0])
+        )
+
+        def relay() -> Iterator[str]:
+            try:
+                if first is not None:
+                    yield first
+                yield from chunks
+            finally:
+                _close(chunks)
+
+        return relay()
+
+
+def hedge_metrics(llm) -> dict | None:
+    """Metrics of the HedgedLLM anywhere in a wrapper chain, if there is one."""
+    while llm is not None:
+        if isinstance(llm, HedgedLLM):
+            return llm.metrics()
+        llm = getattr(llm, "inner", None)
+    return None
+
+
+def hedge_settings() -> dict | None:
+    """HedgedLLM options from LLM_HEDGE_*; None when LLM_HEDGE_PERCENTILE is unset or 0."""
+    percentile = env_float("LLM_HEDGE_PERCENTILE", 0.0)
+    max_ratio = env_float("LLM_HEDGE_MAX_RATIO", DEFAULT_MAX_RATIO)
+    window = env_int("LLM_HEDGE_WINDOW", DEFAULT_WINDOW)
+    min_samples = env_int("LLM_HEDGE_MIN_SAMPLES", DEFAULT_MIN_SAMPLES)
+    if percentile <= 0 or max_ratio <= 0:
+        return None
+    return {
+        "percentile": min(percentile, 100.0),
+        "max_ratio": max_ratio,
+        "window": max(1, window),
+        "min_samples": max(1, min_samples),
+    }
@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+from xml.etree.ElementTree import ParseError, fromstring
+
+
+def parse_opml(text: str) -> list[str]:
+    try:
+        root = fromstring(text)
+    except ParseError as exc:
+        raise ValueError("Invalid OPML document") from exc
+
+    urls: list[str] = []
+    seen: set[str] = set()
+    # Outlines nest arbitrarily deep (folders of folders); iter() walks all of them.
+    for outline in root.iter("outline"):
+        url = (outline.get("xmlUrl") or "").strip()
+        if url and url not in seen:
+            seen.add(url)
+            urls.append(url)
+    return urls
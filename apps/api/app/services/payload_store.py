@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import io
+import os
+import shutil
+import tempfile
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import IO
+
+from shared.utils.env import env_int
+from shared.utils.time import utc_now
+
+
+class PayloadStore:
+    """Raw feed bodies on local disk, compressed and addressed by their sha256."""
+
+    def __init__(self, root: str, compression: str = "gzip") -> None:
+        if compression not in {"gzip", "zstd"}:
+            raise ValueError(f"Unsupported payload compression: {compression}")
+        if compression == "zstd":
+            try:
+                import zstandard  # noqa: F401
+            except ImportError as exc:
+                raise RuntimeError("zstandard package not installed") from exc
+        self.root = Path(root)
+        self.compression = compression
+
+    @property
+    def _suffix(self) -> str:
+        return ".zst" if self.compression == "zstd" else ".gz"
+
+    def _path(self, content_hash: str, suffix: str | None = None) -> Path:
+        return (
+            self.root / content_hash[:2] / content_hash[2:4] / f"{content_hash}{suffix or self._suffix}"
+        )
+
+    def _compress_stream(self, source: IO[bytes], target: IO[bytes]) -> None:
+        if self.compression == "zstd":
+            import zstandard
+
+            zstandard.ZstdCompressor().copy_stream(source, target)
+            return
+        with gzip.GzipFile(fileobj=target, mode="wb", mtime=0) as compressed:
+            shutil.copyfileobj(source, compressed)
+
+    def put(self, body: bytes, content_hash: str | None = None) -> str:
+        return self.put_file(io.BytesIO(body), content_hash or hashlib.sha256(body).hexdigest())
+
+    def put_file(self, source: IO[bytes], content_hash: str | None = None) -> str:
+        """Store a body read from a binary file, compressing it chunk by chunk."""
+        if content_hash is None:
+            digest = hashlib.sha256()
+            for chunk in iter(lambda: source.read(1024 * 1024), b""):
+                digest.update(chunk)
+            source.seek(0)
+            content_hash = digest.hexdigest()
+        path = self._path(content_hash)
+        if path.exists():
+            # Same bytes already stored; refresh the mtime so retention keeps them.
+            os.utime(path)
+            return content_hash
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=path.parent, delete=False) as handle:
+            self._compress_stream(source, handle)
+        os.replace(handle.name, path)
+        return content_hash
+
+    def touch(self, content_hash: str) -> bool:
+        """Refresh a stored payload's mtime so retention keeps it; False if not stored."""
+        touched = False
+        for suffix in (".gz", ".zst"):
+            path = self._path(content_hash, suffix)
+            try:
+                os.utime(path)
+                touched = True
+            except FileNotFoundError:
+                continue
+        return touched
+
+    def get(self, content_hash: str) -> bytes | None:
+        # Read either format so switching PAYLOAD_COMPRESSION keeps older payloads usable.
+        zst_path = self._path(content_hash, ".zst")
+        if zst_path.exists():
+            import zstandard
+
+            return zstandard.ZstdDecompressor().decompressobj().decompress(zst_path.read_bytes())
+        gz_path = self._path(content_hash, ".gz")
+        if gz_path.exists():
+            return gzip.decompress(gz_path.read_bytes())
+        return None
+
+    def prune(self, cutoff: datetime) -> int:
+        threshold = cutoff.timestamp()
+        removed = 0
+        if not self.root.exists():
+            return 0
+        for path in self.root.glob("*/*/*"):
+            try:
+                if path.stat().st_mtime < threshold:
+                    path.unlink()
+                    removed += 1
+            except FileNotFoundError:
+                continue
+        return removed
+
+
+def retention_days() -> int:
+    return env_int("FEED_PAYLOAD_RETENTION_DAYS", 30)
+
+
+def retention_cutoff() -> datetime:
+    return utc_now() - timedelta(days=retention_days())
+
+
+_payload_store: PayloadStore | None = None
+_payload_store_lock = threading.Lock()
+
+
+def get_payload_store() -> PayloadStore | None:
+    """Return the configured store, or None when FEED_PAYLOAD_DIR is empty."""
+    global _payload_store
+    root = os.getenv("FEED_PAYLOAD_DIR", "/var/lib/signalforge/payloads")
+    if not root:
+        return None
+    with _payload_store_lock:
+        if _payload_store is None:
+            _payload_store = PayloadStore(root, os.getenv("PAYLOAD_COMPRESSION", "gzip").lower())
+        return _payload_store
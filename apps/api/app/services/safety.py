@@ -2,8 +2,11 @@ from __future__ import annotations
 
 import os
 import re
+from bisect import bisect_right
+from collections.abc import Iterable
+from functools import lru_cache
 
-from shared.utils.text import normalize_text
+from shared.utils.text import normalize_text, text_features
 
 
 DEFAULT_BLOCKLIST = [
@@ -16,25 +19,118 @@ DEFAULT_BLOCKLIST = [
 ]
 
 
+def _terms(raw: str) -> list[str]:
+    return [normalize_text(term) for term in raw.split(",") if term.strip()]
+
+
 def get_blocklist() -> list[str]:
-    extra = os.getenv("SAFETY_BLOCKLIST", "")
-    terms = [term.strip().lower() for term in extra.split(",") if term.strip()]
-    return sorted(set(DEFAULT_BLOCKLIST + terms))
+    return sorted(set(DEFAULT_BLOCKLIST + _terms(os.getenv("SAFETY_BLOCKLIST", ""))))
+
+
+def _trie_pattern(terms: Iterable[str]) -> str:
+    """One regex alternation with shared prefixes factored out, so matching cost
+    does not grow with the number of terms the way a flat alternation does."""
+    trie: dict = {}
+    for term in terms:
+        node = trie
+        for char in term:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node: dict) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        pattern = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if "" in node:
+            if len(branches) == 1:
+                pattern = f"(?:{pattern})"
+            pattern += "?"
+        return pattern
+
+    return build(trie)
+
+
+class BlocklistMatcher:
+    """Whole-word matcher over a fixed set of blocked terms."""
+
+    def __init__(self, terms: Iterable[str]) -> None:
+        self.terms = frozenset(term for term in (normalize_text(t) for t in terms) if term)
+        self._pattern = (
+            re.compile(rf"\b(?:{_trie_pattern(self.terms)})\b") if self.terms else None
+        )
+
+    def search(self, text: str) -> str | None:
+        """Return the first blocked term in text, if any."""
+        if self._pattern is None:
+            return None
+        match = self._pattern.search(text_features(text).normalized)
+        return match.group(0) if match else None
+
+    def matches(self, text: str) -> bool:
+        return self.search(text) is not None
 
+    def matches_many(self, texts: list[str]) -> list[bool]:
+        """Check every text in one scan over their newline-joined normalized forms."""
+        flags = [False] * len(texts)
+        if self._pattern is None or not texts:
+            return flags
+        normalized = [text_features(text).normalized for text in texts]
+        starts = []
+        offset = 0
+        for text in normalized:
+            starts.append(offset)
+            offset += len(text) + 1
+        joined = "\n".join(normalized)
+        position = 0
+        while True:
+            match = self._pattern.search(joined, position)
+            if match is None:
+                return flags
+            index = bisect_right(starts, match.start()) - 1
+            flags[index] = True
+            # The rest of a flagged text cannot change its answer.
+            if index + 1 == len(starts):
+                return flags
+            position = starts[index + 1]
 
-def contains_blocked_content(text: str) -> bool:
-    normalized = normalize_text(text)
-    for term in get_blocklist():
-        if not term:
-            continue
-        pattern = re.escape(term)
-        if re.search(rf"\b{pattern}\b", normalized):
-            return True
-    return False
+
+@lru_cache(maxsize=128)
+def _compiled(terms: frozenset[str]) -> BlocklistMatcher:
+    return BlocklistMatcher(terms)
+
+
+@lru_cache(maxsize=8)
+def _global_matcher(raw: str) -> BlocklistMatcher:
+    return _compiled(frozenset(DEFAULT_BLOCKLIST + _terms(raw)))
+
+
+def blocklist_matcher(extra_terms: Iterable[str] = ()) -> BlocklistMatcher:
+    """Compiled matcher for the global blocklist plus extra_terms (e.g. a workspace's).
+
+    Matchers are cached by their term set, so a changed SAFETY_BLOCKLIST or
+    workspace list compiles a new one on next use.
+    """
+    matcher = _global_matcher(os.getenv("SAFETY_BLOCKLIST", ""))
+    extra = frozenset(term for term in (normalize_text(t) for t in extra_terms) if term)
+    if not extra - matcher.terms:
+        return matcher
+    return _compiled(matcher.terms | extra)
+
+
+def contains_blocked_content(text: str, extra_terms: Iterable[str] = ()) -> bool:
+    return blocklist_matcher(extra_terms).matches(text)
 
 
 def contains_link(text: str) -> bool:
-    return bool(re.search(r"https?://", text, flags=re.IGNORECASE))
+    return text_features(text).has_link
+
+
+def draft_has_link(draft) -> bool:
+    """The stored has_link flag, falling back to the content for drafts not yet indexed."""
+    if draft.has_link is not None:
+        return draft.has_link
+    return contains_link(draft.content)
 
 
 def split_thread(text: str) -> list[str]:
@@ -6,7 +6,8 @@ from datetime import datetime, time, timedelta
 from zoneinfo import ZoneInfo
 
 from app.models import AccountSettings, Draft, Idea
-from app.services.safety import contains_link
+from app.services.safety import draft_has_link
+from app.services.scoring import effective_score
 from shared.utils.time import utc_now
 
 
@@ -91,10 +92,12 @@ def _format_weight(settings: AccountSettings | None, draft: Draft) -> float:
 
 
 def weighted_choice(drafts: list[Draft], settings: AccountSettings | None) -> Draft | None:
+    now = utc_now()
     weights = []
     for draft in drafts:
         idea = draft.idea
-        weight = max(draft.score, 0.01) * _format_weight(settings, draft) * _topic_weight(settings, idea)
+        score = effective_score(draft.score, idea.published_at if idea else None, now)
+        weight = max(score, 0.01) * _format_weight(settings, draft) * _topic_weight(settings, idea)
         weights.append(max(weight, 0.01))
 
     total = sum(weights)
@@ -136,7 +139,7 @@ def limit_thread_and_link_drafts(
     filtered = []
     for draft in drafts:
         is_thread = draft.is_thread
-        has_link = contains_link(draft.content)
+        has_link = draft_has_link(draft)
 
         if is_thread and max_threads > 0 and thread_count >= max_threads:
             continue
@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+import logging
+import os
+import tempfile
+import threading
+from collections.abc import Callable
+from datetime import datetime
+from pathlib import Path
+from typing import Protocol
+
+import numpy as np
+from sqlalchemy import DateTime, Float, case, cast, func, literal
+from sqlalchemy.sql.elements import ColumnElement
+
+
+logger = logging.getLogger(__name__)
+
+
+TITLE_FULL_LENGTH = 120
+SUMMARY_FULL_LENGTH = 500
+TITLE_WEIGHT = 0.4
+SUMMARY_WEIGHT = 0.4
+RECENCY_WEIGHT = 0.2
+RECENCY_DAYS = 7
+SECONDS_PER_DAY = 86400
+
+
+def score_batch(title_lengths: np.ndarray, summary_lengths: np.ndarray) -> np.ndarray:
+    """Static base score for a chunk of ideas; recency is applied at read time."""
+    title = np.minimum(np.nan_to_num(title_lengths) / TITLE_FULL_LENGTH, 1.0) * TITLE_WEIGHT
+    summary = (
+        np.minimum(np.nan_to_num(summary_lengths) / SUMMARY_FULL_LENGTH, 1.0) * SUMMARY_WEIGHT
+    )
+    return np.round(title + summary, 4)
+
+
+def recency(published_at: datetime | None, now: datetime) -> float:
+    if published_at is None:
+        return 0.0
+    # Whole days, so the value only moves once a day, matching recency_expression.
+    age_days = (now - published_at).days
+    return min(1.0, max(0.0, 1.0 - age_days / RECENCY_DAYS)) * RECENCY_WEIGHT
+
+
+def effective_score(base: float, published_at: datetime | None, now: datetime) -> float:
+    return round(base + recency(published_at, now), 4)
+
+
+def recency_expression(published_at: ColumnElement, now: datetime) -> ColumnElement:
+    age_seconds = func.extract("epoch", literal(now, DateTime(timezone=True)) - published_at)
+    age_days = func.floor(age_seconds / SECONDS_PER_DAY)
+    decay = func.greatest(0.0, func.least(1.0, 1.0 - age_days / RECENCY_DAYS))
+    return func.coalesce(cast(decay, Float) * RECENCY_WEIGHT, 0.0)
+
+
+def effective_score_expression(
+    base: ColumnElement, published_at: ColumnElement, now: datetime
+) -> ColumnElement:
+    """SQL counterpart of effective_score, for ranking without rewriting stored scores."""
+    return base + recency_expression(published_at, now)
+
+
+# Cheap per-idea features, computed in SQL so scoring never loads the text itself.
+FEATURES = (
+    "title_length",
+    "summary_length",
+    "title_words",
+    "summary_words",
+    "has_url",
+    "has_raw_content",
+)
+BASE_MAX = TITLE_WEIGHT + SUMMARY_WEIGHT
+
+
+def _word_count(column: ColumnElement) -> ColumnElement:
+    text = func.coalesce(func.btrim(column), "")
+    spaces = func.char_length(text) - func.char_length(func.replace(text, " ", ""))
+    return case((text == "", 0), else_=spaces + 1)
+
+
+def feature_columns() -> list[ColumnElement]:
+    from app.models import Idea
+
+    return [
+        func.coalesce(func.char_length(Idea.title), 0).label("title_length"),
+        func.coalesce(func.char_length(Idea.summary), 0).label("summary_length"),
+        _word_count(Idea.title).label("title_words"),
+        _word_count(Idea.summary).label("summary_words"),
+        case((Idea.url.is_not(None), 1), else_=0).label("has_url"),
+        case((Idea.raw_content.is_not(None), 1), else_=0).label("has_raw_content"),
+    ]
+
+
+def feature_matrix(rows) -> np.ndarray:
+    """Stack rows selected with feature_columns() into an (n, len(FEATURES)) array."""
+    values = [[getattr(row, name) or 0 for name in FEATURES] for row in rows]
+    return np.array(values, dtype=np.float64).reshape(-1, len(FEATURES))
+
+
+class ScoringModel(Protocol):
+    name: str
+
+    def predict(self, features: np.ndarray) -> np.ndarray:
+        ...
+
+
+class HeuristicModel:
+    name = "heuristic"
+
+    def predict(self, features: np.ndarray) -> np.ndarray:
+        return score_batch(features[:, 0], features[:, 1])
+
+
+class LinearModel:
+    """Standardized linear model whose output is clipped into the heuristic's range."""
+
+    name = "linear"
+
+    def __init__(
+        self, weights: np.ndarray, bias: float, mean: np.ndarray, scale: np.ndarray
+    ) -> None:
+        self.weights = weights
+        self.bias = bias
+        self.mean = mean
+        self.scale = scale
+
+    @classmethod
+    def fit(cls, features: np.ndarray, targets: np.ndarray, ridge: float = 1.0) -> "LinearModel":
+        mean = features.mean(axis=0)
+        scale = features.std(axis=0)
+        scale[scale == 0] = 1.0
+        standardized = (features - mean) / scale
+        gram = standardized.T @ standardized + ridge * np.eye(features.shape[1])
+        bias = float(targets.mean())
+        weights = np.linalg.solve(gram, standardized.T @ (targets - bias))
+        return cls(weights, bias, mean, scale)
+
+    def predict(self, features: np.ndarray) -> np.ndarray:
+        raw = ((features - self.mean) / self.scale) @ self.weights + self.bias
+        return np.round(np.clip(raw, 0.0, 1.0) * BASE_MAX, 4)
+
+    def save(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=path.parent, suffix=".npz", delete=False) as handle:
+            np.savez(
+                handle,
+                kind=np.array(self.name),
+                features=np.array(FEATURES),
+                weights=self.weights,
+                bias=np.array(self.bias),
+                mean=self.mean,
+                scale=self.scale,
+            )
+        os.replace(handle.name, path)
+
+    @classmethod
+    def load(cls, artifact) -> "LinearModel":
+        return cls(
+            artifact["weights"], float(artifact["bias"]), artifact["mean"], artifact["scale"]
+        )
+
+
+MODEL_LOADERS: dict[str, Callable] = {
+    "heuristic": lambda artifact: HeuristicModel(),
+    "linear": LinearModel.load,
+}
+
+_models: dict[str, tuple[float, ScoringModel]] = {}
+_models_lock = threading.Lock()
+
+
+def model_dir() -> Path:
+    return Path(os.getenv("SCORING_MODEL_DIR", "/var/lib/signalforge/models"))
+
+
+def model_path(workspace_id: str | None) -> Path:
+    return model_dir() / f"{workspace_id or 'default'}.npz"
+
+
+def _load_model(path: Path) -> ScoringModel:
+    with np.load(path, allow_pickle=False) as artifact:
+        if tuple(artifact["features"].tolist()) != FEATURES:
+            raise ValueError(f"Model {path} was trained on a different feature set")
+        return MODEL_LOADERS[str(artifact["kind"])](artifact)
+
+
+def get_scoring_model(workspace_id: str | None) -> ScoringModel:
+    """Workspace artifact, else the default artifact, else the built-in heuristic.
+
+    Artifacts are loaded once per process and reloaded when their mtime changes,
+    so dropping a new file into SCORING_MODEL_DIR swaps the model without a deploy.
+    """
+    for path in (model_path(workspace_id), model_path(None)):
+        try:
+            mtime = path.stat().st_mtime
+        except FileNotFoundError:
+            continue
+        key = str(path)
+        with _models_lock:
+            cached = _models.get(key)
+            if cached and cached[0] == mtime:
+                return cached[1]
+            try:
+                model = _load_model(path)
+            except Exception as exc:
+                logger.warning("Scoring model unusable", extra={"path": key, "error": str(exc)})
+                continue
+            _models[key] = (mtime, model)
+            return model
+    return HeuristicModel()
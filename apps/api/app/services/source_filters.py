@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import json
+import re
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from functools import lru_cache
+
+from shared.utils.text import normalize_text
+
+
+@dataclass(frozen=True)
+class SourceFilter:
+    include: re.Pattern | None = None
+    exclude: re.Pattern | None = None
+    min_summary_length: int = 0
+    max_age: timedelta | None = None
+    language: str | None = None
+
+    def drop_reason(
+        self,
+        title: str | None,
+        summary: str | None,
+        published_at: datetime | None,
+        language: str | None,
+        now: datetime,
+    ) -> str | None:
+        # Cheapest checks first; keyword matching needs the normalized text.
+        if self.language and language and not language.lower().startswith(self.language):
+            return "language"
+        if self.max_age and published_at and now - published_at > self.max_age:
+            return "max_age"
+        normalized_summary = normalize_text(summary)
+        if len(normalized_summary) < self.min_summary_length:
+            return "min_summary_length"
+        if self.exclude or self.include:
+            text = f"{normalize_text(title)} {normalized_summary}"
+            if self.exclude and self.exclude.search(text):
+                return "exclude"
+            if self.include and not self.include.search(text):
+                return "include"
+        return None
+
+
+def _keyword_pattern(terms: list | None) -> re.Pattern | None:
+    cleaned = sorted({normalize_text(str(term)) for term in terms or [] if str(term).strip()})
+    if not cleaned:
+        return None
+    # Longest first so a phrase wins over its own prefix inside the alternation.
+    alternation = "|".join(re.escape(term) for term in sorted(cleaned, key=len, reverse=True))
+    # Lookarounds rather than \b, which never matches next to terms like "c++" or "#ai".
+    return re.compile(rf"(?<!\w)(?:{alternation})(?!\w)")
+
+
+@lru_cache(maxsize=1024)
+def _compile(key: str) -> SourceFilter:
+    config = json.loads(key)
+    max_age_days = config.get("max_age_days")
+    language = config.get("language")
+    return SourceFilter(
+        include=_keyword_pattern(config.get("include")),
+        exclude=_keyword_pattern(config.get("exclude")),
+        min_summary_length=int(config.get("min_summary_length") or 0),
+        max_age=timedelta(days=float(max_age_days)) if max_age_days else None,
+        language=str(language).lower() if language else None,
+    )
+
+
+def compile_source_filter(config: dict | None) -> SourceFilter | None:
+    filters = (config or {}).get("filters")
+    if not filters:
+        return None
+    return _compile(json.dumps(filters, sort_keys=True))
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import random
+from datetime import datetime, timedelta
+from statistics import median
+
+
+MIN_POLL_SECONDS = 15 * 60
+MAX_POLL_SECONDS = 24 * 60 * 60
+DEFAULT_POLL_SECONDS = 60 * 60
+BACKOFF_BASE_SECONDS = 15 * 60
+QUIET_GROWTH = 1.5
+POLL_JITTER = 0.1
+RECENT_ENTRIES = 20
+
+
+def _clamp(value: float, low: float, high: float) -> float:
+    return max(low, min(high, value))
+
+
+def observed_interval(published: list[datetime | None]) -> float | None:
+    stamps = sorted({stamp for stamp in published if stamp}, reverse=True)[:RECENT_ENTRIES]
+    if len(stamps) < 2:
+        return None
+    gaps = [(newer - older).total_seconds() for newer, older in zip(stamps, stamps[1:])]
+    gaps = [gap for gap in gaps if gap > 0]
+    if not gaps:
+        return None
+    return median(gaps)
+
+
+def next_interval(
+    previous: int | None,
+    published: list[datetime | None] | None = None,
+    changed: bool = True,
+) -> int:
+    observed = observed_interval(published or [])
+    if observed is not None:
+        # Poll about twice per observed publishing gap so new entries are picked up promptly.
+        interval = observed / 2
+    elif changed:
+        interval = previous or DEFAULT_POLL_SECONDS
+    else:
+        interval = (previous or DEFAULT_POLL_SECONDS) * QUIET_GROWTH
+    return int(_clamp(interval, MIN_POLL_SECONDS, MAX_POLL_SECONDS))
+
+
+def failure_backoff(failures: int) -> int:
+    delay = BACKOFF_BASE_SECONDS * (2 ** max(failures - 1, 0))
+    return int(min(delay, MAX_POLL_SECONDS))
+
+
+def schedule_after(now: datetime, seconds: int) -> datetime:
+    jitter = seconds * POLL_JITTER
+    return now + timedelta(seconds=seconds + random.uniform(-jitter, jitter))
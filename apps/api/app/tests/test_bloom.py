@@ -0,0 +1,52 @@
+from app.services.bloom import BloomFilter, LocalBitStore
+
+
+def _filter() -> BloomFilter:
+    bits, hashes = BloomFilter.sizing(1000, 0.01)
+    return BloomFilter(LocalBitStore(bits), hashes)
+
+
+def test_bloom_rebuild_and_membership():
+    bloom = _filter()
+    assert not bloom.ready()
+
+    known = [f"fp-{i}" for i in range(500)]
+    assert bloom.rebuild(iter(known), batch_size=64) == 500
+    assert bloom.ready()
+    assert all(bloom.might_contain_many(known))
+
+    unknown = [f"new-{i}" for i in range(1000)]
+    false_positives = sum(bloom.might_contain_many(unknown))
+    assert false_positives < 50
+
+    bloom.add_many(["new-0"])
+    assert bloom.might_contain_many(["new-0"]) == [True]
+
+
+def test_bloom_metrics(tmp_path):
+    bits, hashes = BloomFilter.sizing(1000, 0.01)
+    bloom = BloomFilter(LocalBitStore(bits, str(tmp_path / "ideas.bloom")), hashes)
+    assert bloom.metrics()["ready"] is False
+
+    bloom.rebuild(f"fp-{i}" for i in range(1000))
+    metrics = bloom.metrics()
+    assert metrics["ready"] is True
+    assert metrics["memory_bytes"] == (bits + 7) // 8
+    assert 0 < metrics["false_positive_rate"] < 0.05
+    assert 800 < metrics["estimated_items"] < 1200
+
+
+def test_adds_during_rebuild_survive_the_swap(tmp_path):
+    bits, hashes = BloomFilter.sizing(1000, 0.01)
+    path = str(tmp_path / "ideas.bloom")
+    bloom = BloomFilter(LocalBitStore(bits, path), hashes)
+    other_worker = BloomFilter(LocalBitStore(bits, path), hashes)
+    bloom.rebuild(["old"])
+
+    def known():
+        yield "old"
+        other_worker.add_many(["added-mid-rebuild"])
+        yield "also-old"
+
+    bloom.rebuild(known())
+    assert all(other_worker.might_contain_many(["old", "also-old", "added-mid-rebuild"]))
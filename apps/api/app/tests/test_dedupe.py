@@ -0,0 +1,51 @@
+from app.services import dedupe
+from shared.utils.text import text_features
+
+
+def test_minhash_buckets_near_duplicate_stories():
+    a = dedupe.shingles("OpenAI releases new model with improved reasoning for developers today")
+    b = dedupe.shingles("OpenAI releases new model with improved reasoning for developers")
+    c = dedupe.shingles("Local bakery wins award for the best sourdough bread in the city")
+
+    bands_a = set(dedupe.lsh_bands(dedupe.minhash(a)))
+    bands_b = set(dedupe.lsh_bands(dedupe.minhash(b)))
+    bands_c = set(dedupe.lsh_bands(dedupe.minhash(c)))
+
+    assert dedupe.jaccard(a, b) > 0.8
+    assert bands_a & bands_b
+    assert not bands_a & bands_c
+
+
+def test_lsh_bands_fit_int32():
+    signature = dedupe.minhash(dedupe.shingles("markets rally after the rate decision"))
+    bands = dedupe.lsh_bands(signature)
+    assert len(bands) == dedupe.MINHASH_BANDS
+    assert all(0 <= band < 2**31 for band in bands)
+    assert dedupe.minhash(set()) is None
+
+
+def test_content_bands_find_drafts_that_is_similar_would_reject():
+    draft = "Rates held steady today as the central bank signals patience on future cuts"
+    reworded = "Rates held steady today as the central bank signals patience on cuts"
+    unrelated = "Three lessons from shipping a side project in a single weekend"
+
+    assert dedupe.is_similar(draft, reworded)
+    assert set(dedupe.content_bands(draft)) & set(dedupe.content_bands(reworded))
+    assert not set(dedupe.content_bands(draft)) & set(dedupe.content_bands(unrelated))
+    assert dedupe.content_bands("!!!") == []
+
+
+def test_text_features_are_memoized_and_match_stored_hashes():
+    text = "Read the full  story at https://Example.com today"
+    features = text_features(text)
+
+    assert text_features(text) is features
+    assert features.normalized == "read the full story at https://example.com today"
+    assert features.has_link is True
+    assert "full story" in features.shingles
+    assert len(features.token_hashes) == len(features.tokens)
+
+    other = "Read the full story today"
+    assert dedupe.token_hash_overlap_ratio(
+        features.token_hashes, text_features(other).token_hashes
+    ) == dedupe.token_overlap_ratio(text, other)
@@ -0,0 +1,16 @@
+from shared.utils.env import env_float, env_int
+
+
+def test_env_helpers_fall_back_on_unset_empty_or_malformed(monkeypatch):
+    monkeypatch.delenv("SF_TEST_VALUE", raising=False)
+    assert env_int("SF_TEST_VALUE", 7) == 7
+
+    monkeypatch.setenv("SF_TEST_VALUE", "")
+    assert env_float("SF_TEST_VALUE", 1.5) == 1.5
+
+    monkeypatch.setenv("SF_TEST_VALUE", "lots")
+    assert env_int("SF_TEST_VALUE", 3) == 3
+
+    monkeypatch.setenv("SF_TEST_VALUE", "42")
+    assert env_int("SF_TEST_VALUE", 3) == 42
+    assert env_float("SF_TEST_VALUE") == 42.0
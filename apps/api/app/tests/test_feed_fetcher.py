@@ -0,0 +1,65 @@
+import httpx
+
+from app.services.feed_fetcher import FeedFetcher, cache_validators, conditional_headers
+
+
+def _handler(request: httpx.Request) -> httpx.Response:
+    if request.url.path == "/big":
+        return httpx.Response(200, content=b"x" * 2048)
+    if request.url.path == "/missing":
+        return httpx.Response(404)
+    return httpx.Response(200, content=b"<rss></rss>", headers={"content-type": "application/rss+xml"})
+
+
+def _fetcher(**kwargs) -> FeedFetcher:
+    client = httpx.Client(transport=httpx.MockTransport(_handler))
+    return FeedFetcher(client=client, **kwargs)
+
+
+def test_fetch_many_preserves_order_and_counts():
+    fetcher = _fetcher(max_workers=4, per_host_limit=2)
+    urls = ["https://a.test/feed", "https://b.test/missing", "https://a.test/other"]
+
+    results, stats = fetcher.fetch_many(urls)
+
+    assert [r.url for r in results] == urls
+    assert results[0].ok and results[0].body == b"<rss></rss>"
+    assert results[0].headers["content-type"] == "application/rss+xml"
+    assert not results[1].ok and results[1].error == "HTTP 404"
+    assert stats.fetched == 2 and stats.failed == 1
+
+
+def test_fetch_enforces_max_body_size():
+    fetcher = _fetcher(max_bytes=1024)
+    result = fetcher.fetch("https://a.test/big")
+    assert not result.ok
+    assert "exceeds" in result.error
+
+
+def test_conditional_request_round_trip():
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.headers.get("if-none-match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, content=b"<rss></rss>", headers={"etag": '"v1"'})
+
+    fetcher = FeedFetcher(client=httpx.Client(transport=httpx.MockTransport(handler)))
+    first = fetcher.fetch("https://a.test/feed")
+    cache = cache_validators(first)
+    assert cache["etag"] == '"v1"' and cache["content_hash"]
+
+    second = fetcher.fetch("https://a.test/feed", headers=conditional_headers(cache))
+    assert second.not_modified and not second.ok
+    assert cache_validators(second, cache) == cache
+
+
+def test_spooled_fetch_uses_its_own_cap_and_keeps_body_out_of_memory():
+    fetcher = _fetcher(max_bytes=1024, spool_max_bytes=4096)
+    result = fetcher.fetch("https://a.test/big", spool=True)
+    try:
+        assert result.ok and result.body == b""
+        assert result.size == 2048
+        assert result.open_body().read() == b"x" * 2048
+    finally:
+        result.close()
+
+    assert not _fetcher(spool_max_bytes=1024).fetch("https://a.test/big", spool=True).ok
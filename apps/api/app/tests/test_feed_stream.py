@@ -0,0 +1,93 @@
+import io
+from datetime import datetime, timezone
+
+from app.services.feed_stream import feed_type, iter_entries
+
+
+RSS = b"""<?xml version="1.0"?>
+<rss version="2.0" xmlns:content="http://purl.org/rss/1.0/modules/content/">
+  <channel>
+    <title>Example</title>
+    <item>
+      <title>Newest</title>
+      <link>https://example.com/2</link>
+      <description>Second post</description>
+      <content:encoded>Full body</content:encoded>
+      <pubDate>Fri, 06 Feb 2026 10:00:00 GMT</pubDate>
+    </item>
+    <item>
+      <title>Older</title>
+      <link>https://example.com/1</link>
+    </item>
+  </channel>
+</rss>"""
+
+ATOM = b"""<?xml version="1.0"?>
+<feed xmlns="http://www.w3.org/2005/Atom">
+  <entry>
+    <title>Atom entry</title>
+    <link rel="alternate" href="https://example.com/a"/>
+    <id>urn:a</id>
+    <summary>Atom summary</summary>
+    <updated>2026-02-06T10:00:00Z</updated>
+  </entry>
+</feed>"""
+
+RDF = b"""<?xml version="1.0"?>
+<rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#"
+         xmlns="http://purl.org/rss/1.0/" xmlns:dc="http://purl.org/dc/elements/1.1/">
+  <channel rdf:about="https://example.com/">
+    <title>Example</title>
+    <dc:language>de</dc:language>
+  </channel>
+  <item rdf:about="https://example.com/rdf/1">
+    <title>RDF item</title>
+    <link>https://example.com/rdf/1</link>
+    <description>RDF summary</description>
+    <dc:date>2026-02-06T10:00:00+00:00</dc:date>
+    <dc:language>fr</dc:language>
+  </item>
+  <item rdf:about="https://example.com/rdf/2">
+    <title>Second RDF item</title>
+    <link>https://example.com/rdf/2</link>
+  </item>
+</rdf:RDF>"""
+
+
+def test_iter_entries_rss():
+    entries = list(iter_entries(RSS))
+    assert [e["title"] for e in entries] == ["Newest", "Older"]
+    assert entries[0]["summary"] == "Second post"
+    assert entries[0]["content"] == [{"value": "Full body"}]
+    published = datetime(*entries[0]["published_parsed"][:6], tzinfo=timezone.utc)
+    assert published == datetime(2026, 2, 6, 10, 0, tzinfo=timezone.utc)
+    assert "published_parsed" not in entries[1]
+
+
+def test_iter_entries_atom_is_lazy():
+    entries = iter_entries(ATOM)
+    entry = next(entries)
+    assert entry["link"] == "https://example.com/a"
+    assert entry["summary"] == "Atom summary"
+    assert entry["published_parsed"][:4] == (2026, 2, 6, 10)
+
+
+def test_feed_type_detection():
+    assert feed_type(RSS) == "rss"
+    assert feed_type(ATOM) == "atom"
+    assert feed_type(b"<html><body>nope</body></html>") is None
+    assert feed_type(b"not xml") is None
+
+
+def test_iter_entries_rss1():
+    entries = list(iter_entries(RDF))
+    assert [e["title"] for e in entries] == ["RDF item", "Second RDF item"]
+    assert entries[0]["id"] == "https://example.com/rdf/1"
+    assert entries[0]["summary"] == "RDF summary"
+    published = datetime(*entries[0]["published_parsed"][:6], tzinfo=timezone.utc)
+    assert published == datetime(2026, 2, 6, 10, 0, tzinfo=timezone.utc)
+    assert [e["language"] for e in entries] == ["fr", "de"]
+
+
+def test_iter_entries_reads_from_a_file():
+    assert [e["title"] for e in iter_entries(io.BytesIO(RSS))] == ["Newest", "Older"]
@@ -1,4 +1,10 @@
-from app.services.safety import contains_blocked_content, contains_link, split_thread
+from app.services.safety import (
+    BlocklistMatcher,
+    blocklist_matcher,
+    contains_blocked_content,
+    contains_link,
+    split_thread,
+)
 
 
 def test_guardrails_blocklist():
@@ -15,3 +21,27 @@ def test_thread_splitter():
     text = "1) First tweet\n2) Second tweet"
     tweets = split_thread(text)
     assert tweets == ["First tweet", "Second tweet"]
+
+
+def test_blocklist_matcher_shares_prefixes_and_keeps_word_boundaries():
+    matcher = BlocklistMatcher(["go", "go die", "god", "Kill  Yourself"])
+
+    assert matcher.search("Just GO die") == "go die"
+    assert matcher.search("going home") is None
+    assert matcher.search("they said kill yourself") == "kill yourself"
+    assert matcher.matches_many(["good day", "oh god", "", "let's go"]) == [
+        False,
+        True,
+        False,
+        True,
+    ]
+
+
+def test_blocklist_matcher_follows_env_and_workspace_terms(monkeypatch):
+    monkeypatch.setenv("SAFETY_BLOCKLIST", "")
+    assert contains_blocked_content("buy crypto now") is False
+    assert contains_blocked_content("buy crypto now", extra_terms=["crypto"]) is True
+
+    monkeypatch.setenv("SAFETY_BLOCKLIST", "Crypto")
+    assert contains_blocked_content("buy crypto now") is True
+    assert blocklist_matcher() is blocklist_matcher()
@@ -0,0 +1,50 @@
+from app.services.llm_batch import (
+    BatchRequest,
+    LocalBatchProvider,
+    read_batch_file,
+    write_batch_file,
+)
+from app.services.llm_client import DummyLLM
+
+
+class FlakyLLM:
+    def generate(self, prompt: str, max_chars: int) -> str:
+        if prompt == "bad":
+            raise RuntimeError("upstream error")
+        return prompt.upper()[:max_chars]
+
+
+def test_batch_file_round_trips(tmp_path):
+    requests = [
+        BatchRequest("idea-1:tweet_single", "first", 240),
+        BatchRequest("idea-2:tweet_single", "second", 10),
+    ]
+
+    assert write_batch_file(tmp_path / "batch.jsonl", requests) == 2
+    assert list(read_batch_file(tmp_path / "batch.jsonl")) == requests
+
+
+def test_local_provider_completes_batch_on_poll(tmp_path):
+    path = tmp_path / "batch.jsonl"
+    write_batch_file(path, [BatchRequest("a", "good prompt", 4), BatchRequest("b", "bad", 10)])
+    provider = LocalBatchProvider(str(tmp_path / "provider"), FlakyLLM())
+
+    batch_id = provider.submit(path)
+    assert provider.status(batch_id) == "completed"
+    results = {result.custom_id: result for result in provider.results(batch_id)}
+
+    assert results["a"].content == "GOOD"
+    assert results["b"].content is None and results["b"].error == "upstream error"
+    assert provider.status("missing") == "failed"
+
+
+def test_local_provider_defaults_to_dummy_llm(tmp_path):
+    path = tmp_path / "batch.jsonl"
+    write_batch_file(path, [BatchRequest("a", "prompt", 240)])
+    provider = LocalBatchProvider(str(tmp_path / "provider"))
+
+    batch_id = provider.submit(path)
+    provider.status(batch_id)
+
+    [result] = list(provider.results(batch_id))
+    assert result.content == DummyLLM().generate("prompt", 240)
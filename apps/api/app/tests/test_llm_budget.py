@@ -0,0 +1,55 @@
+import pytest
+
+from app.services.llm_budget import (
+    BudgetedLLM,
+    LLMBudget,
+    LocalBucketStore,
+    current_workspace,
+    llm_workspace,
+)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_requests_per_minute_refill_over_time():
+    clock = Clock()
+    budget = LLMBudget(LocalBucketStore(clock), rpm=2)
+
+    assert budget.try_acquire(10) == 0
+    assert budget.try_acquire(10) == 0
+    assert budget.try_acquire(10) == pytest.approx(30.0)
+
+    clock.now = 30.0
+    assert budget.try_acquire(10) == 0
+
+
+def test_workspace_sub_budget_throttles_only_that_workspace():
+    budget = LLMBudget(LocalBucketStore(Clock()), tpm=1000, workspace_tpm=300)
+
+    assert budget.try_acquire(300, "ws-a") == 0
+    assert budget.try_acquire(100, "ws-a") > 0
+    assert budget.try_acquire(300, "ws-b") == 0
+    # The global bucket was only charged for granted calls.
+    assert budget.try_acquire(400) == 0
+    assert budget.try_acquire(1) > 0
+
+
+def test_budgeted_llm_charges_current_workspace():
+    class EchoLLM:
+        def generate(self, prompt, max_chars):
+            return current_workspace() or ""
+
+    budget = LLMBudget(LocalBucketStore(Clock()), workspace_rpm=1, max_wait=0)
+    llm = BudgetedLLM(EchoLLM(), budget, output_tokens=10, multi_output_tokens=20)
+
+    with llm_workspace("ws-a"):
+        assert llm.generate("prompt", 240) == "ws-a"
+        with pytest.raises(RuntimeError):
+            llm.generate("prompt", 240)
+    assert llm.generate("prompt", 240) == ""
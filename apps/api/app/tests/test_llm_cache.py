@@ -0,0 +1,110 @@
+import threading
+import time
+
+from app.services import llm_cache
+from app.services.llm_cache import CachedLLM, SQLiteResponseStore
+
+
+class CountingLLM:
+    model = "test-model"
+
+    def __init__(self, delay: float = 0.0):
+        self.calls = 0
+        self.delay = delay
+        self.lock = threading.Lock()
+
+    def generate(self, prompt: str, max_chars: int) -> str:
+        with self.lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        return f"draft for {prompt}"[:max_chars]
+
+
+def test_repeated_prompt_is_served_from_cache(tmp_path):
+    inner = CountingLLM()
+    llm = CachedLLM(inner, SQLiteResponseStore(str(tmp_path / "cache.db"), ttl=60))
+
+    assert llm.generate("a", max_chars=100) == "draft for a"
+    assert llm.generate("a", max_chars=100) == "draft for a"
+    assert llm.generate("a", max_chars=5) == "draft"
+
+    assert inner.calls == 2
+    assert llm.metrics() == {"hits": 1, "misses": 2, "coalesced": 0, "errors": 0}
+
+
+def test_concurrent_identical_requests_go_upstream_once(tmp_path):
+    inner = CountingLLM(delay=0.05)
+    llm = CachedLLM(inner, SQLiteResponseStore(str(tmp_path / "cache.db"), ttl=60))
+    results = []
+
+    threads = [
+        threading.Thread(target=lambda: results.append(llm.generate("same", max_chars=100)))
+        for _ in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert inner.calls == 1
+    assert results == ["draft for same"] * 5
+
+
+def test_sqlite_store_expires_and_evicts_least_recently_used(tmp_path):
+    store = SQLiteResponseStore(str(tmp_path / "cache.db"), ttl=60, max_entries=2)
+    store.set("a", "1")
+    store.set("b", "2")
+    assert store.get("a") == "1"
+    store.set("c", "3")
+
+    assert store.get("b") is None
+    assert store.get("a") == "1"
+    assert store.get("c") == "3"
+
+    expired = SQLiteResponseStore(str(tmp_path / "expired.db"), ttl=0)
+    expired.set("a", "1")
+    assert expired.get("a") is None
+
+
+def test_multi_format_responses_are_cached_per_budget(tmp_path):
+    class MultiLLM(CountingLLM):
+        def generate_many(self, prompt, budgets):
+            self.calls += 1
+            return {key: f"{key} for {prompt}"[:limit] for key, limit in budgets.items()}
+
+    inner = MultiLLM()
+    llm = CachedLLM(inner, SQLiteResponseStore(str(tmp_path / "cache.db"), ttl=60))
+    budgets = {"tweet_single": 240, "thread_5": 260}
+
+    first = llm.generate_many("idea", budgets)
+    assert llm.generate_many("idea", dict(reversed(budgets.items()))) == first
+    llm.generate_many("idea", {"tweet_single": 240})
+
+    assert first == {"tweet_single": "tweet_single for idea", "thread_5": "thread_5 for idea"}
+    assert inner.calls == 2
+
+
+def test_follower_that_gives_up_waiting_does_not_release_leaders_lock(monkeypatch):
+    class HeldLockStore:
+        def __init__(self):
+            self.released = []
+
+        def get(self, key):
+            return None
+
+        def set(self, key, value):
+            pass
+
+        def acquire(self, key):
+            return None
+
+        def release(self, key, token):
+            self.released.append(token)
+
+    monkeypatch.setattr(llm_cache, "LOCK_TTL_SECONDS", 0.2)
+    monkeypatch.setattr(llm_cache, "LOCK_POLL_SECONDS", 0.05)
+    store = HeldLockStore()
+    llm = CachedLLM(CountingLLM(), store, model="test")
+
+    assert llm.generate("prompt", 100)
+    assert store.released == []
@@ -0,0 +1,128 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.llm_client import (
+    OpenAIClientLLM,
+    cut_at_boundary,
+    generate_concurrently,
+    parse_formats,
+    read_until_budget,
+)
+
+
+class SlowLLM:
+    def __init__(self):
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def generate(self, prompt: str, max_chars: int) -> str:
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(0.01)
+        with self.lock:
+            self.active -= 1
+        if prompt == "boom":
+            raise RuntimeError("upstream error")
+        return prompt[:max_chars]
+
+
+def test_generate_concurrently_keeps_order_and_isolates_errors():
+    llm = SlowLLM()
+    requests = [(f"prompt {i}", 6) for i in range(8)] + [("boom", 10), ("last one", 4)]
+
+    results = generate_concurrently(llm, requests, concurrency=3)
+
+    assert results[:8] == ["prompt"] * 8
+    assert isinstance(results[8], RuntimeError)
+    assert results[9] == "last"
+    assert 1 < llm.peak <= 3
+
+
+def test_parse_formats_reads_strings_and_threads():
+    reply = (
+        "```json\n"
+        '{"tweet_single": "  One tweet.  ", "thread_5": ["first", "", "second"], "extra": "x"}'
+        "\n```"
+    )
+
+    parsed = parse_formats(reply, {"tweet_single": 5, "thread_5": 260, "tweet_hook_payoff": 240})
+
+    assert parsed == {"tweet_single": "One t", "thread_5": "1. first\n2. second"}
+    assert parse_formats("not json", {"tweet_single": 240}) == {}
+
+
+def test_cut_at_boundary_prefers_sentences_then_words():
+    text = "First sentence here. Second sentence runs on and on"
+
+    assert cut_at_boundary(text, 100) == text
+    assert cut_at_boundary(text, 30) == "First sentence here."
+    assert cut_at_boundary("one two three four", 12) == "one two"
+    assert cut_at_boundary("abcdefghij", 4) == "abcd"
+
+
+def test_read_until_budget_stops_and_closes_stream():
+    consumed = []
+    closed = []
+
+    def chunks():
+        try:
+            for word in ["Short one. ", "Then more ", "words ", "that ", "never ", "arrive "]:
+                consumed.append(word)
+                yield word
+        finally:
+            closed.append(True)
+
+    assert read_until_budget(chunks(), 16) == "Short one."
+    assert len(consumed) == 2
+    assert closed == [True]
+
+
+class FakeEvents:
+    def __init__(self, events):
+        self.events = events
+        self.closed = False
+
+    def __iter__(self):
+        return iter(self.events)
+
+    def close(self):
+        self.closed = True
+
+
+def _openai_llm(events):
+    llm = OpenAIClientLLM(api_key="test")
+    llm._client = SimpleNamespace(
+        responses=SimpleNamespace(create=lambda **kwargs: events)
+    )
+    return llm
+
+
+def test_stream_raises_when_response_fails_midway():
+    events = FakeEvents(
+        [
+            SimpleNamespace(type="response.output_text.delta", delta="Half a "),
+            SimpleNamespace(
+                type="response.failed",
+                response=SimpleNamespace(error=SimpleNamespace(message="server_error")),
+            ),
+        ]
+    )
+    with pytest.raises(RuntimeError, match="server_error"):
+        _openai_llm(events).generate("prompt", 100)
+    assert events.closed
+
+
+def test_stream_tolerates_hitting_the_output_cap():
+    incomplete = SimpleNamespace(
+        type="response.incomplete",
+        response=SimpleNamespace(incomplete_details=SimpleNamespace(reason="max_output_tokens")),
+    )
+    events = FakeEvents(
+        [SimpleNamespace(type="response.output_text.delta", delta="Complete enough."), incomplete]
+    )
+    assert _openai_llm(events).generate("prompt", 100) == "Complete enough."
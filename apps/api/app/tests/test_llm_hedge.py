@@ -0,0 +1,99 @@
+import threading
+import time
+
+from app.services.llm_budget import current_workspace, llm_workspace
+from app.services.llm_hedge import HedgedLLM, LatencyHistogram, hedge_metrics
+
+
+class SlowFirstLLM:
+    """Answers instantly, except that the first call after arm() hangs until released."""
+
+    def __init__(self):
+        self.calls = 0
+        self.release = threading.Event()
+        self.armed = False
+        self._lock = threading.Lock()
+
+    def arm(self):
+        self.armed = True
+
+    def generate(self, prompt: str, max_chars: int) -> str:
+        with self._lock:
+            self.calls += 1
+            slow, self.armed = self.armed, False
+        if slow:
+            self.release.wait(5)
+            return "slow"
+        return "fast"
+
+
+def test_histogram_percentile_uses_recent_window():
+    histogram = LatencyHistogram(window=4)
+    for seconds in [10.0, 1.0, 2.0, 3.0, 4.0]:
+        histogram.record(seconds)
+
+    assert histogram.percentile(50) == 2.0
+    assert histogram.percentile(100) == 4.0
+
+
+def test_slow_call_is_hedged_and_first_answer_wins():
+    inner = SlowFirstLLM()
+    llm = HedgedLLM(inner, percentile=90, max_ratio=0.5, min_samples=5)
+    for _ in range(5):
+        assert llm.generate("prompt", 100) == "fast"
+
+    inner.arm()
+    assert llm.generate("prompt", 100) == "fast"
+    inner.release.set()
+    time.sleep(0.05)
+
+    metrics = hedge_metrics(llm)
+    assert inner.calls == 7
+    assert metrics["requests"] == 6
+    assert metrics["hedged"] == 1
+    assert metrics["hedge_wins"] == 1
+    assert metrics["saved_seconds"] > 0
+
+
+def test_hedge_ratio_is_capped():
+    inner = SlowFirstLLM()
+    llm = HedgedLLM(inner, percentile=90, max_ratio=0.01, min_samples=5)
+    for _ in range(5):
+        llm.generate("prompt", 100)
+
+    inner.arm()
+    threading.Timer(0.1, inner.release.set).start()
+    assert llm.generate("prompt", 100) == "slow"
+    assert llm.metrics()["hedged"] == 0
+    assert inner.calls == 6
+
+
+def test_workspace_reaches_inner_client():
+    class WorkspaceLLM:
+        def generate(self, prompt, max_chars):
+            return current_workspace() or ""
+
+    llm = HedgedLLM(WorkspaceLLM(), min_samples=1)
+    with llm_workspace("ws-a"):
+        assert llm.generate("prompt", 100) == "ws-a"
+        assert llm.generate("prompt", 100) == "ws-a"
+
+
+def test_hedge_is_skipped_when_budget_has_no_room():
+    inner = SlowFirstLLM()
+    reserved = []
+
+    def reserve(kind, prompt):
+        reserved.append(kind)
+        return False
+
+    llm = HedgedLLM(inner, percentile=90, max_ratio=0.5, min_samples=5, reserve=reserve)
+    for _ in range(5):
+        llm.generate("prompt", 100)
+
+    inner.arm()
+    threading.Timer(0.1, inner.release.set).start()
+    assert llm.generate("prompt", 100) == "slow"
+    assert reserved == ["generate"]
+    assert llm.metrics()["hedged"] == 0
+    assert llm.metrics()["budget_skipped"] == 1
@@ -0,0 +1,23 @@
+import pytest
+
+from app.services.opml import parse_opml
+
+
+def test_parse_opml_nested_and_deduplicated():
+    text = """<?xml version="1.0"?>
+<opml version="2.0">
+  <body>
+    <outline text="Tech">
+      <outline text="A" type="rss" xmlUrl="https://a.example/feed"/>
+      <outline text="B" type="rss" xmlUrl="https://b.example/rss"/>
+    </outline>
+    <outline text="A again" type="rss" xmlUrl="https://a.example/feed"/>
+    <outline text="Folder only"/>
+  </body>
+</opml>"""
+    assert parse_opml(text) == ["https://a.example/feed", "https://b.example/rss"]
+
+
+def test_parse_opml_rejects_garbage():
+    with pytest.raises(ValueError):
+        parse_opml("<opml><body>")
@@ -0,0 +1,49 @@
+import io
+import os
+from datetime import timedelta
+
+from app.services.payload_store import PayloadStore
+from shared.utils.time import utc_now
+
+
+def test_put_is_content_addressed(tmp_path):
+    store = PayloadStore(str(tmp_path))
+    body = b"<rss><channel><item><title>Hi</title></item></channel></rss>"
+
+    first = store.put(body)
+    second = store.put(body)
+
+    assert first == second
+    assert len(list(tmp_path.glob("*/*/*"))) == 1
+    assert store.get(first) == body
+    assert store.get("0" * 64) is None
+
+
+def test_prune_removes_payloads_older_than_cutoff(tmp_path):
+    store = PayloadStore(str(tmp_path))
+    content_hash = store.put(b"old feed")
+
+    assert store.prune(utc_now() - timedelta(days=1)) == 0
+    assert store.prune(utc_now() + timedelta(seconds=1)) == 1
+    assert store.get(content_hash) is None
+
+
+def test_touch_keeps_unchanged_payload_through_prune(tmp_path):
+    store = PayloadStore(str(tmp_path))
+    content_hash = store.put(b"quiet feed")
+    path = next(tmp_path.glob("*/*/*"))
+    old = (utc_now() - timedelta(days=60)).timestamp()
+    os.utime(path, (old, old))
+
+    assert store.touch(content_hash) is True
+    assert store.prune(utc_now() - timedelta(days=30)) == 0
+    assert store.touch("0" * 64) is False
+
+
+def test_put_file_matches_put(tmp_path):
+    store = PayloadStore(str(tmp_path))
+    body = b"<rss>" + b"x" * 10000 + b"</rss>"
+    content_hash = store.put_file(io.BytesIO(body))
+
+    assert content_hash == store.put(body)
+    assert store.get(content_hash) == body
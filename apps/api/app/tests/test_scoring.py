@@ -0,0 +1,45 @@
+from datetime import timedelta
+
+import numpy as np
+
+from app.services.scoring import effective_score, score_batch
+from shared.utils.time import utc_now
+
+
+def test_score_batch_weights_lengths():
+    scores = score_batch(np.array([120.0, 60.0, 0.0]), np.array([500.0, 1000.0, 0.0]))
+
+    assert scores.tolist() == [0.8, 0.6, 0.0]
+
+
+def test_effective_score_decays_by_whole_days():
+    now = utc_now()
+
+    assert effective_score(0.5, now, now) == 0.7
+    # 3.5 days old counts as 3 whole days: 0.2 * (1 - 3/7).
+    assert effective_score(0.5, now - timedelta(days=3.5), now) == round(0.5 + 0.2 * 4 / 7, 4)
+    assert effective_score(0.5, now - timedelta(days=30), now) == 0.5
+    assert effective_score(0.5, None, now) == 0.5
+
+
+def test_linear_model_round_trips_through_registry(tmp_path, monkeypatch):
+    from app.services import scoring
+
+    monkeypatch.setenv("SCORING_MODEL_DIR", str(tmp_path))
+    assert isinstance(scoring.get_scoring_model("ws-1"), scoring.HeuristicModel)
+
+    rng = np.random.default_rng(0)
+    features = rng.uniform(0, 200, size=(100, len(scoring.FEATURES)))
+    targets = np.clip(features[:, 0] / 200, 0, 1)
+    model = scoring.LinearModel.fit(features, targets)
+    model.save(scoring.model_path("ws-1"))
+
+    loaded = scoring.get_scoring_model("ws-1")
+    assert isinstance(loaded, scoring.LinearModel)
+    assert loaded is scoring.get_scoring_model("ws-1")
+    predictions = loaded.predict(features)
+    assert predictions.shape == (100,)
+    assert 0.0 <= predictions.min() and predictions.max() <= scoring.BASE_MAX
+    assert np.corrcoef(predictions, targets)[0, 1] > 0.9
+    # Other workspaces fall back to the built-in heuristic until a default artifact exists.
+    assert isinstance(scoring.get_scoring_model("ws-2"), scoring.HeuristicModel)
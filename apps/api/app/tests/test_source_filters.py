@@ -0,0 +1,49 @@
+from datetime import datetime, timedelta, timezone
+
+from app.services.source_filters import compile_source_filter
+
+
+NOW = datetime(2026, 2, 6, 12, 0, tzinfo=timezone.utc)
+
+
+def test_source_filter_reasons():
+    source_filter = compile_source_filter(
+        {
+            "filters": {
+                "include": ["AI", "machine learning"],
+                "exclude": ["sponsored"],
+                "min_summary_length": 10,
+                "max_age_days": 2,
+                "language": "en",
+            }
+        }
+    )
+
+    def reason(title, summary="A long enough summary", published=NOW, language="en-US"):
+        return source_filter.drop_reason(title, summary, published, language, NOW)
+
+    assert reason("New AI model released") is None
+    assert reason("Machine   Learning at scale") is None
+    assert reason("Sponsored: AI tools") == "exclude"
+    assert reason("Gardening tips") == "include"
+    assert reason("AI news", summary="short") == "min_summary_length"
+    assert reason("AI news", published=NOW - timedelta(days=3)) == "max_age"
+    assert reason("AI news", language="de") == "language"
+    assert reason("AI news", language=None) is None
+
+
+def test_source_filter_absent_or_cached():
+    assert compile_source_filter({}) is None
+    config = {"filters": {"exclude": ["ads"]}}
+    assert compile_source_filter(config) is compile_source_filter(dict(config))
+
+
+def test_source_filter_matches_terms_with_symbols():
+    source_filter = compile_source_filter({"filters": {"include": ["C++", "#ai"]}})
+
+    def reason(title):
+        return source_filter.drop_reason(title, "", None, None, NOW)
+
+    assert reason("Modern c++ tricks") is None
+    assert reason("Thread on #AI tooling") is None
+    assert reason("Notes on chain-of-thought #aid") == "include"
@@ -0,0 +1,19 @@
+from datetime import datetime, timedelta, timezone
+
+from app.services import source_polling
+
+
+def test_next_interval_tracks_publishing_rate():
+    base = datetime(2026, 2, 6, 12, 0, tzinfo=timezone.utc)
+    hourly = [base - timedelta(hours=i) for i in range(6)]
+    daily = [base - timedelta(days=i) for i in range(6)]
+
+    assert source_polling.next_interval(None, hourly) == 30 * 60
+    assert source_polling.next_interval(None, daily) == 12 * 60 * 60
+    assert source_polling.next_interval(3600, [], changed=False) == 5400
+
+
+def test_failure_backoff_is_exponential_and_capped():
+    assert source_polling.failure_backoff(1) == 15 * 60
+    assert source_polling.failure_backoff(3) == 60 * 60
+    assert source_polling.failure_backoff(20) == source_polling.MAX_POLL_SECONDS
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import argparse
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+for path in (ROOT / "apps" / "api", ROOT, ROOT / "workers"):
+    if str(path) not in sys.path:
+        sys.path.append(str(path))
+
+from sqlalchemy import select
+
+from app.db.session import SessionLocal
+from app.models import FeedPayload
+from tasks.ingest import replay_source_payloads
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Re-run parsing and idea creation from stored feed payloads"
+    )
+    parser.add_argument("--source", action="append", dest="sources", default=[])
+    parser.add_argument("--since", help="ISO timestamp; only replay payloads fetched after it")
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+
+    source_ids = args.sources
+    if not source_ids:
+        with SessionLocal() as session:
+            source_ids = [
+                str(source_id)
+                for source_id in session.scalars(select(FeedPayload.source_id).distinct()).all()
+            ]
+
+    def replay(source_id: str) -> dict:
+        return replay_source_payloads(source_id, args.since)
+
+    with ThreadPoolExecutor(max_workers=max(1, args.workers)) as pool:
+        for stats in pool.map(replay, source_ids):
+            print(
+                f"{stats['source_id']}: payloads={stats['payloads']} inserted={stats['inserted']} "
+                f"skipped={stats['skipped']} missing={stats['missing']} failed={stats['failed']}"
+            )
+
+
+if __name__ == "__main__":
+    main()
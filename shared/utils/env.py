@@ -0,0 +1,19 @@
+from __future__ import annotations
+
+import os
+
+
+def env_int(name: str, default: int = 0) -> int:
+    """Integer setting from the environment; unset, empty or malformed gives default."""
+    try:
+        return int(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+def env_float(name: str, default: float = 0.0) -> float:
+    """Float setting from the environment; unset, empty or malformed gives default."""
+    try:
+        return float(os.getenv(name, str(default)))
+    except ValueError:
+        return default
@@ -1,8 +1,19 @@
 from __future__ import annotations
 
+import hashlib
 import re
+from collections import Counter
+from dataclasses import dataclass
+from functools import cached_property, lru_cache
+
+from shared.utils.hashing import sha256_text
 
 _whitespace = re.compile(r"\s+")
+_word_re = re.compile(r"[a-z0-9']+")
+_link_re = re.compile(r"https?://")
+
+SHINGLE_SIZE = 2
+FEATURES_CACHE_SIZE = 4096
 
 
 def normalize_text(text: str | None) -> str:
@@ -11,3 +22,67 @@ def normalize_text(text: str | None) -> str:
     text = text.strip().lower()
     text = _whitespace.sub(" ", text)
     return text
+
+
+def hash_feature(value: str) -> int:
+    """Stable signed 32-bit hash, so feature arrays fit a Postgres integer[] column."""
+    digest = hashlib.blake2b(value.encode("utf-8"), digest_size=4).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+def text_tokens(text: str | None) -> tuple[str, ...]:
+    """Tokens without going through the memo, for long or one-off texts."""
+    return tuple(_word_re.findall(normalize_text(text)))
+
+
+def hash_tokens(text: str | None) -> list[int]:
+    """Uncached TextFeatures.token_hashes, for long or one-off texts."""
+    return sorted(hash_feature(token) for token in text_tokens(text))
+
+
+def hash_shingles(shingles: frozenset[str] | set[str]) -> list[int]:
+    return sorted({hash_feature(shingle) for shingle in shingles})
+
+
+def word_shingles(tokens: tuple[str, ...] | list[str], size: int = SHINGLE_SIZE) -> frozenset[str]:
+    if len(tokens) < size:
+        return frozenset({" ".join(tokens)}) if tokens else frozenset()
+    return frozenset(" ".join(tokens[i : i + size]) for i in range(len(tokens) - size + 1))
+
+
+@dataclass(frozen=True)
+class TextFeatures:
+    """Everything the pipeline derives from a text, computed from one normalization."""
+
+    normalized: str
+    tokens: tuple[str, ...]
+    shingles: frozenset[str]
+    has_link: bool
+    fingerprint: str
+
+    @cached_property
+    def token_counts(self) -> Counter:
+        return Counter(self.tokens)
+
+    @cached_property
+    def token_hashes(self) -> list[int]:
+        """Hashed token multiset, sorted; the compact form stored on drafts and ideas."""
+        return sorted(hash_feature(token) for token in self.tokens)
+
+    @cached_property
+    def shingle_hashes(self) -> list[int]:
+        return hash_shingles(self.shingles)
+
+
+@lru_cache(maxsize=FEATURES_CACHE_SIZE)
+def text_features(text: str | None) -> TextFeatures:
+    """Memoized features for short, repeatedly seen texts such as drafts."""
+    normalized = normalize_text(text)
+    tokens = tuple(_word_re.findall(normalized))
+    return TextFeatures(
+        normalized=normalized,
+        tokens=tokens,
+        shingles=word_shingles(tokens),
+        has_link=bool(_link_re.search(normalized)),
+        fingerprint=sha256_text(normalized),
+    )
@@ -24,9 +24,17 @@ celery_app.conf.timezone = "UTC"
 celery_app.conf.task_acks_late = True
 
 celery_app.conf.beat_schedule = {
-    "ingest_sources_hourly": {
+    "ingest_sources_planner": {
         "task": "ingest_sources",
-        "schedule": 60 * 60,
+        "schedule": 60 * 5,
+    },
+    "rebuild_idea_filter_daily": {
+        "task": "rebuild_idea_filter",
+        "schedule": crontab(hour=3, minute=0),
+    },
+    "prune_feed_payloads_daily": {
+        "task": "prune_feed_payloads",
+        "schedule": crontab(hour=3, minute=30),
     },
     "score_ideas_hourly": {
         "task": "score_ideas",
@@ -36,6 +44,10 @@ celery_app.conf.beat_schedule = {
         "task": "generate_drafts",
         "schedule": 60 * 60 * 2,
     },
+    "poll_llm_batches": {
+        "task": "poll_llm_batches",
+        "schedule": 60 * 5,
+    },
     "schedule_posts_hourly": {
         "task": "schedule_posts",
         "schedule": 60 * 60,
@@ -48,4 +60,8 @@ celery_app.conf.beat_schedule = {
         "task": "learn_templates",
         "schedule": crontab(hour=2, minute=0),
     },
+    "train_scoring_models_daily": {
+        "task": "train_scoring_models",
+        "schedule": crontab(hour=2, minute=30),
+    },
 }
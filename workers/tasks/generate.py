@@ -2,20 +2,49 @@ from __future__ import annotations
 
 import json
 import logging
+import math
+from datetime import timedelta
 from pathlib import Path
+from uuid import UUID, uuid4
 
-from sqlalchemy import select
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
 
 from app.db.session import SessionLocal
-from app.models import Draft, Idea
-from app.services.llm_client import get_llm, load_prompt, render_prompt
+from app.models import AccountSettings, Draft, Idea, LLMBatch, XAccount
+from app.services.dedupe import content_bands
+from app.services.llm_batch import (
+    BatchRequest,
+    batch_dir,
+    get_batch_provider,
+    read_batch_file,
+    write_batch_file,
+)
+from app.services.llm_budget import llm_workspace
+from app.services.llm_cache import cache_metrics
+from app.services.llm_hedge import hedge_metrics
+from app.services.llm_client import (
+    cut_at_boundary,
+    get_llm,
+    load_prompt,
+    map_concurrently,
+    render_prompt,
+)
+from app.services.scoring import effective_score_expression
 from celery_app import celery_app
-from shared.utils.hashing import sha256_text
-from shared.utils.text import normalize_text
+from shared.utils.env import env_float
+from shared.utils.text import text_features
+from shared.utils.time import utc_now
 
 
 logger = logging.getLogger(__name__)
 
+INVENTORY_STATUSES = ("draft", "approved", "scheduled")
+DEFAULT_FORMAT = "tweet_single"
+MULTI_FORMAT_PROMPT = "multi_format.txt"
+# A batch still "submitting" after this long lost its worker before the provider answered.
+STALE_SUBMIT_SECONDS = 3600
+
 
 def _formats_path() -> Path:
     current = Path(__file__).resolve()
@@ -31,66 +60,398 @@ def _load_formats() -> dict:
 
 
 def _content_fingerprint(text: str) -> str:
-    return sha256_text(normalize_text(text))
+    return text_features(text).fingerprint
+
+
+def _inventory_days() -> float:
+    return max(0.0, env_float("DRAFT_INVENTORY_DAYS", 2.0))
+
+
+def _draft_demand(session: Session) -> dict[UUID, int]:
+    """Drafts each enabled account still needs to cover DRAFT_INVENTORY_DAYS of posting."""
+    capacity = dict(
+        session.execute(
+            select(
+                XAccount.id,
+                func.greatest(AccountSettings.daily_post_min, AccountSettings.daily_post_max),
+            )
+            .join(AccountSettings, AccountSettings.x_account_id == XAccount.id)
+            .where(XAccount.is_enabled.is_(True))
+        ).all()
+    )
+    if not capacity:
+        return {}
+    # Drafts still awaiting guardrails count too; they become approved inventory shortly.
+    # Formats of one idea are alternatives for a single post, so inventory counts ideas.
+    backlog = dict(
+        session.execute(
+            select(
+                Draft.x_account_id,
+                func.count(func.distinct(func.coalesce(Draft.idea_id, Draft.id))),
+            )
+            .where(Draft.x_account_id.in_(list(capacity)))
+            .where(Draft.status.in_(INVENTORY_STATUSES))
+            .group_by(Draft.x_account_id)
+        ).all()
+    )
+    # So do ideas out in an LLM batch.
+    in_flight = dict(
+        session.execute(
+            select(Idea.x_account_id, func.count(Idea.id))
+            .where(Idea.x_account_id.in_(list(capacity)))
+            .where(Idea.status == "batched")
+            .group_by(Idea.x_account_id)
+        ).all()
+    )
+    days = _inventory_days()
+    return {
+        account_id: max(
+            0,
+            math.ceil(daily_max * days)
+            - backlog.get(account_id, 0)
+            - in_flight.get(account_id, 0),
+        )
+        for account_id, daily_max in capacity.items()
+    }
+
+
+def _select_ideas(session: Session, demand: dict[UUID, int]) -> list[Idea]:
+    ranking = effective_score_expression(Idea.score, Idea.published_at, utc_now()).desc()
+    ideas: list[Idea] = []
+    # Pull-based: only each account's top ideas, as many as its inventory is short.
+    for account_id, needed in demand.items():
+        if needed <= 0:
+            continue
+        ideas.extend(
+            session.scalars(
+                select(Idea)
+                .where(Idea.x_account_id == account_id)
+                .where(Idea.status == "scored")
+                .where(~select(Draft.id).where(Draft.idea_id == Idea.id).exists())
+                .order_by(ranking)
+                .limit(needed)
+            ).all()
+        )
+    return ideas
+
+
+def _render(prompt: str, idea: Idea, **extra: str) -> str:
+    return render_prompt(
+        prompt,
+        title=idea.title or "",
+        summary=idea.summary or "",
+        url=idea.url or "",
+        **extra,
+    )
+
+
+def _account_formats(settings: AccountSettings | None, formats: dict) -> list[str]:
+    """Formats worth drafting for an account: positive weight, and threads only if allowed."""
+    weights = (settings.format_weights if settings else None) or {}
+    keys = []
+    for key, cfg in formats.items():
+        if float(weights.get(key, 1.0)) <= 0:
+            continue
+        if cfg.get("is_thread") and settings and (
+            settings.thread_ratio <= 0 or int(cfg.get("thread_count", 1)) > settings.max_thread_len
+        ):
+            continue
+        keys.append(key)
+    # Highest weight first, so a truncated reply still carries the preferred formats.
+    keys.sort(key=lambda key: float(weights.get(key, 1.0)), reverse=True)
+    return keys or [DEFAULT_FORMAT]
+
+
+def _streams(format_keys: list[str], formats: dict) -> bool:
+    # A lone plain-text format skips the JSON envelope, so its reply can be streamed
+    # and cut off at the character budget.
+    return len(format_keys) == 1 and not formats[format_keys[0]].get("is_thread")
+
+
+def _format_instructions(format_keys: list[str], formats: dict) -> str:
+    lines = []
+    for key in format_keys:
+        cfg = formats[key]
+        if cfg.get("is_thread"):
+            shape = (
+                f"a JSON array of {cfg.get('thread_count', 1)} strings, "
+                f"each at most {cfg['max_chars']} characters"
+            )
+        else:
+            shape = f"a string of at most {cfg['max_chars']} characters"
+        lines.append(f'- "{key}": {cfg.get("instructions", key)}, as {shape}')
+    return "\n".join(lines)
+
+
+def _add_draft(
+    session: Session, idea: Idea, content: str, format_key: str, format_cfg: dict
+) -> bool:
+    if not content:
+        return False
+    fingerprint = _content_fingerprint(content)
+    exists = session.scalar(select(Draft.id).where(Draft.content_fingerprint == fingerprint))
+    if exists:
+        return False
+
+    draft = Draft(
+        workspace_id=idea.workspace_id,
+        x_account_id=idea.x_account_id,
+        idea_id=idea.id,
+        content=content,
+        content_fingerprint=fingerprint,
+        format=format_key,
+        is_thread=bool(format_cfg.get("is_thread", False)),
+        thread_count=int(format_cfg.get("thread_count", 1)),
+        score=idea.score,
+        lsh_bands=content_bands(content),
+        token_hashes=text_features(content).token_hashes,
+        has_link=text_features(content).has_link,
+        status="draft",
+    )
+    session.add(draft)
+    idea.status = "drafted"
+    return True
+
+
+def _submit_batch(
+    session: Session, ideas: list[Idea], prompt: str, max_chars: int, format_key: str
+) -> dict:
+    stats = {"batched": 0, "batch_id": None}
+    if not ideas:
+        return stats
+    provider = get_batch_provider()
+    batch = LLMBatch(id=uuid4(), provider=provider.name, external_id="", status="submitting")
+    path = batch_dir() / f"{batch.id}.jsonl"
+    count = write_batch_file(
+        path,
+        (
+            BatchRequest(f"{idea.id}:{format_key}", _render(prompt, idea), max_chars)
+            for idea in ideas
+        ),
+    )
+    batch.request_count = count
+    session.add(batch)
+    for idea in ideas:
+        idea.status = "batched"
+    # Claim the ideas before the provider sees them, so a failed commit never
+    # leaves an upstream batch whose results have nowhere to go.
+    session.commit()
+    try:
+        external_id = provider.submit(path)
+    except Exception:
+        batch.stats = _ingest_batch(session, batch, [], {})
+        batch.status = "failed"
+        batch.completed_at = utc_now()
+        session.commit()
+        raise
+    batch.external_id = external_id
+    batch.status = "submitted"
+    session.commit()
+    stats.update({"batched": count, "batch_id": str(batch.id)})
+    return stats
+
+
+def _release_stale_submits(session: Session) -> int:
+    cutoff = utc_now() - timedelta(seconds=STALE_SUBMIT_SECONDS)
+    batches = session.scalars(
+        select(LLMBatch)
+        .where(LLMBatch.status == "submitting")
+        .where(LLMBatch.created_at < cutoff)
+        .with_for_update(skip_locked=True)
+    ).all()
+    for batch in batches:
+        batch.stats = _ingest_batch(session, batch, [], {})
+        batch.status = "failed"
+        batch.completed_at = utc_now()
+    session.commit()
+    return len(batches)
 
 
 @celery_app.task(name="generate_drafts")
-def generate_drafts() -> dict:
+def generate_drafts(batch: bool = False) -> dict:
     llm = get_llm()
     formats = _load_formats()
     created = 0
     skipped = 0
+    failed = 0
+    cache_before = cache_metrics(llm)
+    hedge_before = hedge_metrics(llm)
 
     with SessionLocal() as session:
-        ideas = session.scalars(select(Idea).where(Idea.status == "scored")).all()
-
-        for idea in ideas:
-            existing = session.scalar(select(Draft.id).where(Draft.idea_id == idea.id))
-            if existing:
-                skipped += 1
-                continue
+        demand = _draft_demand(session)
+        ideas = _select_ideas(session, demand)
 
-            format_key = "tweet_single"
+        if batch:
+            # Batches stay single-format; results arrive later through poll_llm_batches.
+            format_key = DEFAULT_FORMAT
             format_cfg = formats[format_key]
-            prompt = load_prompt(format_cfg["prompt"])
-            rendered = render_prompt(
-                prompt,
-                title=idea.title or "",
-                summary=idea.summary or "",
-                url=idea.url or "",
+            stats = _submit_batch(
+                session,
+                ideas,
+                load_prompt(format_cfg["prompt"]),
+                int(format_cfg["max_chars"]),
+                format_key,
             )
+            stats["requested"] = sum(demand.values())
+            logger.info("generate_drafts batch submitted", extra=stats)
+            return stats
 
-            content = llm.generate(rendered, max_chars=int(format_cfg["max_chars"]))
-            if not content:
-                skipped += 1
-                continue
+        settings_by_account = {
+            settings.x_account_id: settings
+            for settings in session.scalars(
+                select(AccountSettings).where(AccountSettings.x_account_id.in_(list(demand)))
+            ).all()
+        }
+        prompt = load_prompt(MULTI_FORMAT_PROMPT)
+        prompts: dict[str, str] = {}
+        pending = []
+        for idea in ideas:
+            format_keys = _account_formats(settings_by_account.get(idea.x_account_id), formats)
+            budgets = {key: int(formats[key]["max_chars"]) for key in format_keys}
+            if _streams(format_keys, formats):
+                name = formats[format_keys[0]]["prompt"]
+                prompts.setdefault(name, load_prompt(name))
+                rendered = _render(prompts[name], idea)
+            else:
+                rendered = _render(prompt, idea, formats=_format_instructions(format_keys, formats))
+            pending.append((idea, rendered, budgets))
 
-            fingerprint = _content_fingerprint(content)
-            exists = session.scalar(select(Draft.id).where(Draft.content_fingerprint == fingerprint))
-            if exists:
-                skipped += 1
-                continue
+        # One call per idea returns every format; calls run concurrently and are
+        # applied in ranking order.
+        def call(item) -> dict[str, str]:
+            idea, rendered, budgets = item
+            # Set per call: pool threads do not inherit the caller's context.
+            with llm_workspace(idea.workspace_id):
+                if _streams(list(budgets), formats):
+                    [(key, max_chars)] = budgets.items()
+                    return {key: llm.generate(rendered, max_chars=max_chars)}
+                return llm.generate_many(rendered, budgets)
 
-            draft = Draft(
-                workspace_id=idea.workspace_id,
-                x_account_id=idea.x_account_id,
-                idea_id=idea.id,
-                content=content,
-                content_fingerprint=fingerprint,
-                format=format_key,
-                is_thread=bool(format_cfg.get("is_thread", False)),
-                thread_count=int(format_cfg.get("thread_count", 1)),
-                score=idea.score,
-                status="draft",
+        results = map_concurrently(call, pending)
+
+        for (idea, _, budgets), contents in zip(pending, results):
+            if isinstance(contents, Exception):
+                # The idea stays "scored" so the next run retries it.
+                logger.error(
+                    "Draft generation error",
+                    extra={"idea_id": str(idea.id), "error": str(contents)},
+                )
+                failed += 1
+                continue
+            added = sum(
+                _add_draft(session, idea, contents.get(key, ""), key, formats[key])
+                for key in budgets
             )
-            session.add(draft)
-            idea.status = "drafted"
-            created += 1
+            if added:
+                created += added
+            else:
+                skipped += 1
 
         session.commit()
 
-    logger.info(
-        "generate_drafts complete",
-        extra={"created": created, "skipped": skipped},
-    )
-    return {"created": created, "skipped": skipped}
+    stats = {
+        "created": created,
+        "skipped": skipped,
+        "failed": failed,
+        "requested": sum(demand.values()),
+    }
+    cache_after = cache_metrics(llm)
+    if cache_before is not None and cache_after is not None:
+        stats["llm_cache"] = {name: cache_after[name] - cache_before[name] for name in cache_after}
+    hedge_after = hedge_metrics(llm)
+    if hedge_before is not None and hedge_after is not None:
+        stats["llm_hedge"] = {name: hedge_after[name] - hedge_before[name] for name in hedge_after}
+    logger.info("generate_drafts complete", extra=stats)
+    return stats
+
+
+def _ingest_batch(session: Session, batch: LLMBatch, results, formats: dict) -> dict:
+    stats = {"created": 0, "skipped": 0, "failed": 0, "released": 0}
+    path = batch_dir() / f"{batch.id}.jsonl"
+    requested = {request.custom_id: request for request in read_batch_file(path)}
+    answered: set[str] = set()
+
+    for result in results:
+        request = requested.get(result.custom_id)
+        if request is None or result.custom_id in answered:
+            continue
+        answered.add(result.custom_id)
+        idea_id, format_key = result.custom_id.split(":", 1)
+        idea = session.get(Idea, UUID(idea_id))
+        # Only ideas still waiting on this batch are touched, so re-ingesting is a no-op.
+        if idea is None or idea.status != "batched":
+            continue
+        if result.error:
+            idea.status = "scored"
+            stats["failed"] += 1
+            continue
+        content = cut_at_boundary(result.content or "", request.max_chars)
+        if _add_draft(session, idea, content, format_key, formats[format_key]):
+            stats["created"] += 1
+        else:
+            idea.status = "scored"
+            stats["skipped"] += 1
+
+    for custom_id in set(requested) - answered:
+        idea = session.get(Idea, UUID(custom_id.split(":", 1)[0]))
+        if idea is not None and idea.status == "batched":
+            idea.status = "scored"
+            stats["released"] += 1
+    return stats
+
+
+@celery_app.task(name="poll_llm_batches")
+def poll_llm_batches() -> dict:
+    formats = _load_formats()
+    summary = {"pending": 0, "ingested": 0, "failed": 0, "created": 0, "stale": 0}
+
+    with SessionLocal() as session:
+        summary["stale"] = _release_stale_submits(session)
+        submitted = session.execute(
+            select(LLMBatch.id, LLMBatch.provider, LLMBatch.external_id)
+            .where(LLMBatch.status == "submitted")
+            .order_by(LLMBatch.created_at)
+        ).all()
+        session.rollback()
+
+        for batch_id, provider_name, external_id in submitted:
+            provider = get_batch_provider(provider_name)
+            # Asked with no row locked: the local provider does the generating right here.
+            try:
+                status = provider.status(external_id)
+            except Exception as exc:
+                logger.error(
+                    "LLM batch poll error", extra={"batch_id": str(batch_id), "error": str(exc)}
+                )
+                continue
+            if status == "in_progress":
+                summary["pending"] += 1
+                continue
+            # Lock one batch per transaction so a concurrent poll skips it instead of re-ingesting.
+            batch = session.scalar(
+                select(LLMBatch)
+                .where(LLMBatch.id == batch_id)
+                .where(LLMBatch.status == "submitted")
+                .with_for_update(skip_locked=True)
+            )
+            if batch is None:
+                session.rollback()
+                continue
+            try:
+                results = provider.results(batch.external_id) if status == "completed" else []
+                stats = _ingest_batch(session, batch, results, formats)
+            except Exception as exc:
+                session.rollback()
+                logger.error(
+                    "LLM batch poll error", extra={"batch_id": str(batch.id), "error": str(exc)}
+                )
+                continue
+            batch.status = "ingested" if status == "completed" else "failed"
+            batch.stats = stats
+            batch.completed_at = utc_now()
+            session.commit()
+            summary["ingested" if status == "completed" else "failed"] += 1
+            summary["created"] += stats["created"]
+
+    logger.info("poll_llm_batches complete", extra=summary)
+    return summary
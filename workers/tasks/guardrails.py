@@ -1,18 +1,40 @@
 from __future__ import annotations
 
 import logging
+import math
 
-from sqlalchemy import select
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.orm import Session, selectinload
 
-from app.models import AccountSettings, Draft
-from app.services.dedupe import is_similar
-from app.services.safety import contains_blocked_content, contains_link, split_thread
+from app.models import AccountSettings, BlockedTerm, Draft
+from app.services.dedupe import content_bands, token_hash_overlap_ratio
+from app.services.safety import (
+    BlocklistMatcher,
+    blocklist_matcher,
+    draft_has_link,
+    split_thread,
+)
 from app.db.session import SessionLocal
 from celery_app import celery_app
+from shared.utils.env import env_int
+from shared.utils.text import hash_tokens, text_features
 
 
 logger = logging.getLogger(__name__)
 
+KEPT_STATUSES = ["approved", "scheduled", "posted"]
+SIMILARITY_THRESHOLD = 0.85
+SOURCE_SIMILARITY_THRESHOLD = 0.8
+INDEX_BATCH_SIZE = 1000
+
+
+def _batch_size() -> int:
+    return max(1, env_int("GUARDRAILS_BATCH_SIZE", 100))
+
+
+def _worker_count() -> int:
+    return max(1, env_int("GUARDRAILS_WORKERS", 1))
+
 
 def _max_len(draft: Draft) -> int:
     return 260 if draft.is_thread else 240
@@ -23,81 +45,264 @@ def _reject(draft: Draft, reason: str) -> None:
     logger.info("draft rejected", extra={"draft_id": str(draft.id), "reason": reason})
 
 
-@celery_app.task(name="guardrails_check")
-def guardrails_check() -> dict:
-    approved = 0
-    rejected = 0
+def _ensure_features(draft: Draft) -> None:
+    if draft.lsh_bands is not None and draft.token_hashes is not None:
+        return
+    features = text_features(draft.content)
+    draft.lsh_bands = content_bands(draft.content)
+    draft.token_hashes = features.token_hashes
+    draft.has_link = features.has_link
 
-    with SessionLocal() as session:
-        drafts = session.scalars(select(Draft).where(Draft.status == "draft")).all()
 
+def _index_missing_features(session: Session) -> int:
+    """Fill stored text features for drafts written before they existed, in id order."""
+    indexed = 0
+    last_id = None
+    while True:
+        query = (
+            select(Draft)
+            .where(or_(Draft.lsh_bands.is_(None), Draft.token_hashes.is_(None)))
+            .order_by(Draft.id)
+            .with_for_update(skip_locked=True)
+        )
+        if last_id is not None:
+            query = query.where(Draft.id > last_id)
+        drafts = session.scalars(query.limit(INDEX_BATCH_SIZE)).all()
+        if not drafts:
+            return indexed
         for draft in drafts:
-            settings = None
-            if draft.x_account_id:
-                settings = session.scalar(
-                    select(AccountSettings).where(AccountSettings.x_account_id == draft.x_account_id)
+            _ensure_features(draft)
+        indexed += len(drafts)
+        last_id = drafts[-1].id
+        session.commit()
+
+
+class _PolicyInputs:
+    """Account settings and blocklist matchers for a batch, each loaded at most once.
+
+    Preloaded for the batch's own drafts; similar drafts from other accounts or
+    workspaces are loaded on first use and kept for the rest of the batch.
+    """
+
+    def __init__(self, session: Session, drafts: list[Draft]) -> None:
+        self.session = session
+        self._settings: dict = {}
+        self._matchers: dict = {}
+        self._load_settings({draft.x_account_id for draft in drafts if draft.x_account_id})
+        self._load_matchers({draft.workspace_id for draft in drafts})
+
+    def _load_settings(self, account_ids: set) -> None:
+        self._settings.update(dict.fromkeys(account_ids))
+        if not account_ids:
+            return
+        for settings in self.session.scalars(
+            select(AccountSettings).where(AccountSettings.x_account_id.in_(account_ids))
+        ).all():
+            self._settings[settings.x_account_id] = settings
+
+    def _load_matchers(self, workspace_ids: set) -> None:
+        terms: dict = {workspace_id: [] for workspace_id in workspace_ids}
+        if workspace_ids:
+            for workspace_id, term in self.session.execute(
+                select(BlockedTerm.workspace_id, BlockedTerm.term).where(
+                    BlockedTerm.workspace_id.in_(workspace_ids)
                 )
+            ):
+                terms[workspace_id].append(term)
+        for workspace_id, workspace_terms in terms.items():
+            self._matchers[workspace_id] = blocklist_matcher(workspace_terms)
+
+    def settings(self, account_id) -> AccountSettings | None:
+        if account_id and account_id not in self._settings:
+            self._load_settings({account_id})
+        return self._settings.get(account_id)
+
+    def matcher(self, workspace_id) -> BlocklistMatcher:
+        if workspace_id not in self._matchers:
+            self._load_matchers({workspace_id})
+        return self._matchers[workspace_id]
+
+
+def _passes_checks(draft: Draft, inputs: _PolicyInputs) -> bool:
+    """Whether a pending draft clears every check that does not compare it to other drafts."""
+    is_blocked = inputs.matcher(draft.workspace_id).matches(draft.content)
+    if _policy_rejection(draft, inputs.settings(draft.x_account_id), is_blocked):
+        return False
+    return not (draft.idea and _similar_to_source(draft))
+
+
+def _has_similar_draft(session: Session, draft: Draft, inputs: _PolicyInputs) -> bool:
+    # Of two similar pending drafts only the older survives. An older one still
+    # pending (possibly in another worker's open batch) only blocks this draft if
+    # it clears the other checks itself, so the pair cannot both be rejected.
+    # Only drafts sharing an LSH band get the exact comparison.
+    if not draft.lsh_bands:
+        return False
+    older = or_(
+        Draft.created_at < draft.created_at,
+        and_(Draft.created_at == draft.created_at, Draft.id < draft.id),
+    )
+    candidates = session.scalars(
+        select(Draft)
+        .where(Draft.id != draft.id)
+        .where(or_(Draft.status.in_(KEPT_STATUSES), and_(Draft.status == "draft", older)))
+        .where(Draft.lsh_bands.overlap(draft.lsh_bands))
+        .options(selectinload(Draft.idea))
+    ).all()
+    for other in candidates:
+        if token_hash_overlap_ratio(draft.token_hashes, other.token_hashes) < SIMILARITY_THRESHOLD:
+            continue
+        if other.status != "draft" or _passes_checks(other, inputs):
+            return True
+    return False
+
+
+def _similar_to_source(draft: Draft) -> bool:
+    idea = draft.idea
+    stored = [idea.summary_token_hashes, idea.raw_token_hashes]
+    texts = [idea.summary or "", idea.raw_content or ""]
+    # Ideas ingested before token hashes were stored fall back to their text.
+    hashes = [
+        value if value is not None else hash_tokens(text) for value, text in zip(stored, texts)
+    ]
+    return any(
+        token_hash_overlap_ratio(draft.token_hashes, value) >= SOURCE_SIMILARITY_THRESHOLD
+        for value in hashes
+    )
+
+
+def _blocked_drafts(drafts: list[Draft], inputs: _PolicyInputs) -> set:
+    """Ids of drafts hitting the global or their workspace's blocklist, one scan per workspace."""
+    by_workspace: dict = {}
+    for draft in drafts:
+        by_workspace.setdefault(draft.workspace_id, []).append(draft)
+
+    blocked = set()
+    for workspace_id, group in by_workspace.items():
+        flags = inputs.matcher(workspace_id).matches_many([d.content for d in group])
+        blocked.update(draft.id for draft, flag in zip(group, flags) if flag)
+    return blocked
 
-            max_len = _max_len(draft)
-            if draft.is_thread:
-                tweets = split_thread(draft.content)
-                if any(len(tweet) > max_len for tweet in tweets):
-                    _reject(draft, "thread_length")
-                    rejected += 1
-                    continue
-            else:
-                if len(draft.content) > max_len:
-                    _reject(draft, "length")
-                    rejected += 1
-                    continue
-
-            if contains_blocked_content(draft.content):
-                _reject(draft, "safety")
-                rejected += 1
-                continue
-
-            if contains_link(draft.content):
-                allow_links = bool(settings.allow_links) if settings else False
-                ratio = float(settings.link_post_ratio) if settings else 0.0
-                if not allow_links or ratio <= 0:
-                    _reject(draft, "link_policy")
-                    rejected += 1
-                    continue
-
-            if draft.is_thread and settings and draft.thread_count > settings.max_thread_len:
-                _reject(draft, "thread_limit")
-                rejected += 1
-                continue
-
-            if draft.is_thread and settings and settings.thread_ratio <= 0:
-                _reject(draft, "thread_ratio")
-                rejected += 1
-                continue
-
-            if draft.idea:
-                source_texts = [draft.idea.summary or "", draft.idea.raw_content or ""]
-                if any(is_similar(draft.content, text, threshold=0.8) for text in source_texts):
-                    _reject(draft, "source_similarity")
-                    rejected += 1
-                    continue
-
-            others = session.scalars(
-                select(Draft)
-                .where(Draft.id != draft.id)
-                .where(Draft.status.in_(["draft", "approved", "scheduled", "posted"]))
-            ).all()
-            if any(is_similar(draft.content, other.content) for other in others):
-                _reject(draft, "similarity")
-                rejected += 1
-                continue
 
+def _policy_rejection(
+    draft: Draft, settings: AccountSettings | None, is_blocked: bool
+) -> str | None:
+    max_len = _max_len(draft)
+    if draft.is_thread:
+        tweets = split_thread(draft.content)
+        if any(len(tweet) > max_len for tweet in tweets):
+            return "thread_length"
+    elif len(draft.content) > max_len:
+        return "length"
+
+    if is_blocked:
+        return "safety"
+
+    if draft_has_link(draft):
+        allow_links = bool(settings.allow_links) if settings else False
+        ratio = float(settings.link_post_ratio) if settings else 0.0
+        if not allow_links or ratio <= 0:
+            return "link_policy"
+
+    if draft.is_thread and settings and draft.thread_count > settings.max_thread_len:
+        return "thread_limit"
+
+    if draft.is_thread and settings and settings.thread_ratio <= 0:
+        return "thread_ratio"
+    return None
+
+
+def _rejection(session: Session, draft: Draft, inputs: _PolicyInputs, blocked: set) -> str | None:
+    # The up-front index skips rows other workers had locked; fill any gaps here.
+    _ensure_features(draft)
+    reason = _policy_rejection(draft, inputs.settings(draft.x_account_id), draft.id in blocked)
+    if reason:
+        return reason
+
+    if draft.idea and _similar_to_source(draft):
+        return "source_similarity"
+
+    if _has_similar_draft(session, draft, inputs):
+        return "similarity"
+    return None
+
+
+def _claim_batch(session: Session, size: int) -> list[Draft]:
+    # Rows another worker holds are skipped rather than waited on, so concurrent
+    # runs split the pending drafts between them instead of checking them twice.
+    return list(
+        session.scalars(
+            select(Draft)
+            .where(Draft.status == "draft")
+            .order_by(Draft.created_at, Draft.id)
+            .limit(size)
+            .with_for_update(skip_locked=True)
+            .options(selectinload(Draft.idea))
+        ).all()
+    )
+
+
+def _check_batch(session: Session, drafts: list[Draft]) -> tuple[int, int]:
+    inputs = _PolicyInputs(session, drafts)
+    blocked = _blocked_drafts(drafts, inputs)
+
+    approved = 0
+    rejected = 0
+    for draft in drafts:
+        reason = _rejection(session, draft, inputs, blocked)
+        if reason:
+            _reject(draft, reason)
+            rejected += 1
+        else:
             draft.status = "approved"
             approved += 1
+    return approved, rejected
 
-        session.commit()
 
-    logger.info(
-        "guardrails_check complete",
-        extra={"approved": approved, "rejected": rejected},
-    )
-    return {"approved": approved, "rejected": rejected}
+def _drain() -> dict:
+    """Claim and check batches until no unclaimed pending draft is left."""
+    stats = {"approved": 0, "rejected": 0, "batches": 0}
+    size = _batch_size()
+    with SessionLocal() as session:
+        while True:
+            drafts = _claim_batch(session, size)
+            if not drafts:
+                break
+            approved, rejected = _check_batch(session, drafts)
+            # Committing releases the batch's row locks.
+            session.commit()
+            stats["approved"] += approved
+            stats["rejected"] += rejected
+            stats["batches"] += 1
+    return stats
+
+
+@celery_app.task(name="guardrails_claim")
+def guardrails_claim() -> dict:
+    stats = _drain()
+    logger.info("guardrails_claim complete", extra=stats)
+    return stats
+
+
+@celery_app.task(name="guardrails_check")
+def guardrails_check() -> dict:
+    """Drain pending drafts, with helper guardrails_claim tasks when the backlog is large.
+
+    approved/rejected/batches cover this task's own share only; each helper reports
+    its share in its own result, listed under helper_task_ids.
+    """
+    with SessionLocal() as session:
+        _index_missing_features(session)
+        pending = session.scalar(
+            select(func.count()).select_from(Draft).where(Draft.status == "draft")
+        )
+
+    # This run drains alongside the helpers it dispatches.
+    helpers = max(0, min(_worker_count(), math.ceil((pending or 0) / _batch_size())) - 1)
+    helper_task_ids = [guardrails_claim.delay().id for _ in range(helpers)]
+
+    stats = _drain()
+    stats["scope"] = "own"
+    stats["helper_task_ids"] = helper_task_ids
+    logger.info("guardrails_check complete", extra=stats)
+    return stats
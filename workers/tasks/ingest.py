@@ -1,20 +1,68 @@
 from __future__ import annotations
 
 import logging
-from datetime import datetime, timezone
+import random
+import time
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from uuid import UUID, uuid4
 
 import feedparser
-from sqlalchemy import select
+from celery import chord
+from sqlalchemy import delete, func, or_, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
 
 from app.db.session import SessionLocal
-from app.models import Idea, Source, XAccount
+from app.models import FeedPayload, Idea, Source, XAccount
+from app.services.bloom import get_idea_filter
+from app.services.dedupe import jaccard, lsh_bands, minhash
+from app.services.feed_fetcher import (
+    FetchResult,
+    cache_validators,
+    conditional_headers,
+    get_feed_fetcher,
+)
+from app.services.feed_stream import ParseError, feed_type, iter_entries
+from app.services.payload_store import get_payload_store, retention_cutoff
+from app.services.source_filters import SourceFilter, compile_source_filter
+from app.services.source_polling import failure_backoff, next_interval, schedule_after
 from celery_app import celery_app
+from shared.utils.env import env_int
 from shared.utils.hashing import sha256_text
-from shared.utils.text import normalize_text
+from shared.utils.text import (
+    hash_shingles,
+    hash_tokens,
+    normalize_text,
+    text_tokens,
+    word_shingles,
+)
+from shared.utils.time import utc_now
 
 
 logger = logging.getLogger(__name__)
 
+PLANNER_WINDOW_SECONDS = 5 * 60
+DISPATCH_LEASE_SECONDS = 15 * 60
+HIGH_WATER_STALE_RUN = 10
+PROBE_BATCH_SIZE = 50
+CLUSTER_WINDOW = timedelta(days=3)
+CLUSTER_MIN_JACCARD = 0.5
+# Rows are looked up, clustered and inserted this many at a time, bounding memory on archives.
+STORE_CHUNK_SIZE = 500
+
+
+@dataclass
+class StoreResult:
+    inserted: int = 0
+    skipped: int = 0
+    clustered: int = 0
+    lookups_skipped: int = 0
+    dropped: dict[str, int] = field(default_factory=dict)
+    published: list[datetime | None] = field(default_factory=list)
+    high_water: dict | None = None
+
 
 def _entry_published(entry) -> datetime | None:
     published = entry.get("published_parsed") or entry.get("updated_parsed")
@@ -40,69 +88,739 @@ def _entry_raw(entry) -> str | None:
     return None
 
 
+def _entry_language(entry) -> str | None:
+    if entry.get("language"):
+        return entry["language"]
+    for detail in ("title_detail", "summary_detail"):
+        language = (entry.get(detail) or {}).get("language")
+        if language:
+            return language
+    return None
+
+
 def _fingerprint(*parts: str | None) -> str:
     normalized = normalize_text("|".join([part or "" for part in parts]))
     return sha256_text(normalized)
 
 
-@celery_app.task(name="ingest_sources")
-def ingest_sources() -> dict:
-    inserted = 0
-    skipped = 0
-    failed = 0
+def _stream_min_bytes() -> int:
+    return env_int("INGEST_STREAM_MIN_BYTES", 1024 * 1024)
+
+
+def _parsed_entries(source: Source, result: FetchResult) -> list:
+    feed = feedparser.parse(
+        result.open_body(),
+        response_headers={"content-type": result.headers.get("content-type", "")},
+    )
+    if getattr(feed, "bozo", False):
+        logger.warning("Feed parse warning", extra={"url": source.url})
+    return feed.entries
+
+
+def _streamed_entries(source: Source, result: FetchResult) -> Iterator[dict]:
+    streamed = 0
+    try:
+        for entry in iter_entries(result.open_body()):
+            streamed += 1
+            yield entry
+    except ParseError:
+        # Entries already yielded come round again; _store_entries drops repeated fingerprints.
+        logger.warning("Feed stream parse failed, falling back", extra={"url": source.url})
+        yield from _parsed_entries(source, result)
+        return
+    if not streamed:
+        # A dialect the streaming parser does not know; feedparser handles the rest.
+        yield from _parsed_entries(source, result)
+
+
+def _feed_entries(source: Source, result: FetchResult) -> Iterable:
+    config = source.config or {}
+    if config.get("stream") or result.size >= _stream_min_bytes():
+        return _streamed_entries(source, result)
+    return _parsed_entries(source, result)
+
+
+def _high_water_published(high_water: dict | None) -> datetime | None:
+    value = (high_water or {}).get("published_at")
+    return datetime.fromisoformat(value) if value else None
+
+
+def _maybe_seen(fingerprints: list[str]) -> list[str]:
+    # A Bloom miss means the fingerprint was never stored, so only hits need the DB check.
+    try:
+        bloom = get_idea_filter()
+        if not bloom.ready():
+            return fingerprints
+        hits = bloom.might_contain_many(fingerprints)
+    except Exception as exc:
+        logger.warning("Idea filter unavailable", extra={"error": str(exc)})
+        return fingerprints
+    return [fingerprint for fingerprint, hit in zip(fingerprints, hits) if hit]
+
+
+def _remember(fingerprints: list[str]) -> None:
+    try:
+        get_idea_filter().add_many(fingerprints)
+    except Exception as exc:
+        logger.warning("Idea filter unavailable", extra={"error": str(exc)})
+
+
+def _story_text(title: str | None, summary: str | None) -> str:
+    return f"{title or ''} {summary or ''}"
+
+
+def _assign_clusters(session: Session, source: Source, rows: list[dict]) -> int:
+    features: dict[UUID, set[int]] = {}
+    bands: set[int] = set()
+    for row in rows:
+        row["id"] = uuid4()
+        row["cluster_id"] = row["id"]
+        row["lsh_bands"] = None
+        # Each entry is seen once, so skip the text_features memo. Hashes are stored
+        # so later stages compare them instead of re-tokenizing the text.
+        story = word_shingles(text_tokens(_story_text(row["title"], row["summary"])))
+        row["shingle_hashes"] = hash_shingles(story)
+        row["summary_token_hashes"] = hash_tokens(row["summary"])
+        row["raw_token_hashes"] = hash_tokens(row["raw_content"])
+        features[row["id"]] = set(row["shingle_hashes"])
+        signature = minhash(set(story))
+        if signature is None:
+            continue
+        row["lsh_bands"] = lsh_bands(signature)
+        bands.update(row["lsh_bands"])
+
+    if not bands:
+        return 0
+
+    # LSH buckets only nominate candidates; membership is confirmed with exact Jaccard.
+    index: dict[int, list[tuple[set[int], UUID]]] = {}
+    candidates = session.execute(
+        select(
+            Idea.id, Idea.cluster_id, Idea.title, Idea.summary, Idea.lsh_bands, Idea.shingle_hashes
+        )
+        .where(Idea.workspace_id == source.workspace_id)
+        .where(Idea.x_account_id.is_not_distinct_from(source.x_account_id))
+        .where(Idea.created_at >= utc_now() - CLUSTER_WINDOW)
+        .where(Idea.lsh_bands.overlap(sorted(bands)))
+    ).all()
+    for idea_id, cluster_id, title, summary, idea_bands, shingle_hashes in candidates:
+        if shingle_hashes is None:
+            shingle_hashes = hash_shingles(word_shingles(text_tokens(_story_text(title, summary))))
+        candidate = (set(shingle_hashes), cluster_id or idea_id)
+        for band in idea_bands or []:
+            index.setdefault(band, []).append(candidate)
+
+    clustered = 0
+    for row in rows:
+        if row["lsh_bands"] is None:
+            continue
+        row_features = features[row["id"]]
+        match = next(
+            (
+                cluster_id
+                for band in row["lsh_bands"]
+                for candidate_features, cluster_id in index.get(band, [])
+                if jaccard(row_features, candidate_features) >= CLUSTER_MIN_JACCARD
+            ),
+            None,
+        )
+        if match:
+            # Only the cluster representative moves on to scoring and drafting.
+            row["cluster_id"] = match
+            row["status"] = "clustered"
+            clustered += 1
+            continue
+        for band in row["lsh_bands"]:
+            index.setdefault(band, []).append((row_features, row["id"]))
+    return clustered
+
+
+def _repoint_orphans(session: Session, rows: list[dict], inserted_ids: set[UUID]) -> int:
+    """Move members off cluster representatives that lost the insert to a concurrent run.
+
+    Members join the idea that won the fingerprint; with none to join they stand
+    alone. Returns how many ended up unclustered.
+    """
+    dropped = {row["id"]: row["fingerprint"] for row in rows if row["id"] not in inserted_ids}
+    orphans = [
+        row for row in rows if row["id"] in inserted_ids and row["cluster_id"] in dropped
+    ]
+    if not orphans:
+        return 0
+    winners = dict(
+        session.execute(
+            select(Idea.fingerprint, func.coalesce(Idea.cluster_id, Idea.id)).where(
+                Idea.fingerprint.in_({dropped[row["cluster_id"]] for row in orphans})
+            )
+        ).all()
+    )
+    unclustered = 0
+    for row in orphans:
+        target = winners.get(dropped[row["cluster_id"]])
+        if target is None:
+            unclustered += 1
+        session.execute(
+            update(Idea)
+            .where(Idea.id == row["id"])
+            .values(cluster_id=target or row["id"], status="clustered" if target else "new")
+        )
+    return unclustered
+
+
+def _flush_rows(session: Session, source: Source, rows: list[dict], result: StoreResult) -> None:
+    """Look up, cluster and insert one chunk of candidate rows into result's counts."""
+    maybe_seen = _maybe_seen([row["fingerprint"] for row in rows])
+    result.lookups_skipped += len(rows) - len(maybe_seen)
+    known: set[str] = set()
+    if maybe_seen:
+        known = set(
+            session.scalars(select(Idea.fingerprint).where(Idea.fingerprint.in_(maybe_seen))).all()
+        )
+    new_rows = [row for row in rows if row["fingerprint"] not in known]
+    if not new_rows:
+        return
+
+    clustered = _assign_clusters(session, source, new_rows)
+    # ON CONFLICT covers rows a concurrent ingest run committed after the lookup.
+    inserted_ids = set(
+        session.scalars(
+            insert(Idea)
+            .on_conflict_do_nothing(index_elements=[Idea.fingerprint])
+            .returning(Idea.id),
+            new_rows,
+        ).all()
+    )
+    inserted = [row for row in new_rows if row["id"] in inserted_ids]
+    result.clustered += clustered - _repoint_orphans(session, new_rows, inserted_ids)
+    _remember([row["fingerprint"] for row in inserted])
+    result.inserted += len(inserted)
+
+
+def _store_entries(
+    session: Session,
+    source: Source,
+    entries: Iterable,
+    high_water: dict | None = None,
+    source_filter: SourceFilter | None = None,
+) -> StoreResult:
+    now = utc_now()
+    dropped: dict[str, int] = {}
+    mark_fingerprint = (high_water or {}).get("fingerprint")
+    mark_published = _high_water_published(high_water)
+    newest_published = mark_published
+    first_fingerprint = None
+    published: list[datetime | None] = []
+    seen: set[str] = set()
+    rows: list[dict] = []
+    result = StoreResult(dropped=dropped, published=published)
+    stale_run = 0
+    total = 0
+
+    for entry in entries:
+        title = entry.get("title")
+        url = entry.get("link") or entry.get("id")
+        summary = _entry_summary(entry)
+        fingerprint = _fingerprint(title, url, summary)
+        if fingerprint == mark_fingerprint:
+            break
+
+        entry_published = _entry_published(entry)
+        if mark_published and entry_published and entry_published <= mark_published:
+            # Tolerate a few out-of-order entries before assuming the rest were seen.
+            stale_run += 1
+            if stale_run >= HIGH_WATER_STALE_RUN:
+                break
+        else:
+            stale_run = 0
+
+        total += 1
+        published.append(entry_published)
+        first_fingerprint = first_fingerprint or fingerprint
+        if entry_published and (newest_published is None or entry_published > newest_published):
+            newest_published = entry_published
+
+        if fingerprint in seen:
+            continue
+        seen.add(fingerprint)
+        if source_filter:
+            reason = source_filter.drop_reason(
+                title, summary, entry_published, _entry_language(entry), now
+            )
+            if reason:
+                dropped[reason] = dropped.get(reason, 0) + 1
+                continue
+        rows.append(
+            {
+                "workspace_id": source.workspace_id,
+                "x_account_id": source.x_account_id,
+                "source_id": source.id,
+                "title": title,
+                "summary": summary,
+                "url": url,
+                "published_at": entry_published,
+                "raw_content": _entry_raw(entry),
+                "fingerprint": fingerprint,
+                "score": 0.0,
+                "status": "new",
+            }
+        )
+        if len(rows) >= STORE_CHUNK_SIZE:
+            _flush_rows(session, source, rows, result)
+            rows = []
+    if rows:
+        _flush_rows(session, source, rows, result)
+
+    next_high_water = high_water
+    if first_fingerprint:
+        next_high_water = {
+            "fingerprint": first_fingerprint,
+            "published_at": newest_published.isoformat() if newest_published else None,
+        }
+    if mark_published:
+        published.append(mark_published)
+
+    result.high_water = next_high_water
+    result.skipped = total - sum(dropped.values()) - result.inserted
+    return result
+
+
+def _record_success(
+    source: Source,
+    now: datetime,
+    published: list[datetime | None] | None = None,
+    changed: bool = True,
+) -> None:
+    source.failure_count = 0
+    source.last_error = None
+    source.last_ingested_at = now
+    source.poll_interval_seconds = next_interval(source.poll_interval_seconds, published, changed)
+    source.next_poll_at = schedule_after(now, source.poll_interval_seconds)
+
+
+def _record_failure(source: Source, now: datetime, error: str) -> None:
+    source.failure_count = (source.failure_count or 0) + 1
+    source.last_error = error
+    source.next_poll_at = schedule_after(now, failure_backoff(source.failure_count))
+
+
+def _empty_stats(source_id: str) -> dict:
+    return {
+        "source_id": source_id,
+        "status": "skipped",
+        "inserted": 0,
+        "skipped": 0,
+        "clustered": 0,
+        "lookups_skipped": 0,
+        "dropped": {},
+    }
+
+
+def _keep_payload(session: Session, source: Source, result: FetchResult) -> None:
+    # Keeping the raw body lets parser and fingerprint changes be replayed without refetching.
+    try:
+        store = get_payload_store()
+        if store is None:
+            return
+        content_hash = store.put_file(result.open_body(), result.content_hash)
+    except Exception as exc:
+        logger.warning("Payload store unavailable", extra={"url": source.url, "error": str(exc)})
+        return
+    session.add(
+        FeedPayload(
+            source_id=source.id,
+            content_hash=content_hash,
+            content_type=result.headers.get("content-type"),
+            size=result.size,
+        )
+    )
+
+
+def _refresh_payload(session: Session, source: Source, content_hash: str | None) -> None:
+    """Keep the payload of an unchanged feed from aging out of retention."""
+    if not content_hash:
+        return
+    try:
+        store = get_payload_store()
+        if store is None or not store.touch(content_hash):
+            return
+    except Exception as exc:
+        logger.warning("Payload store unavailable", extra={"url": source.url, "error": str(exc)})
+        return
+    latest = session.scalar(
+        select(FeedPayload.id)
+        .where(FeedPayload.source_id == source.id)
+        .where(FeedPayload.content_hash == content_hash)
+        .order_by(FeedPayload.fetched_at.desc())
+        .limit(1)
+    )
+    if latest:
+        session.execute(
+            update(FeedPayload).where(FeedPayload.id == latest).values(fetched_at=utc_now())
+        )
 
+
+def _ingest_fetched(session: Session, source: Source, result: FetchResult) -> dict:
+    """Parse and store one fetched feed, update the source's poll state, and commit."""
+    stats = _empty_stats(str(source.id))
+    stats["elapsed"] = round(result.elapsed, 3)
+    config = dict(source.config or {})
+    previous_cache = config.get("http_cache") or {}
+    now = utc_now()
+
+    if result.not_modified or (
+        result.ok
+        and result.content_hash
+        and result.content_hash == previous_cache.get("content_hash")
+    ):
+        config["http_cache"] = cache_validators(result, previous_cache)
+        source.config = config
+        _refresh_payload(session, source, previous_cache.get("content_hash"))
+        _record_success(source, now, changed=False)
+        session.commit()
+        stats["status"] = "unchanged"
+        return stats
+
+    if not result.ok:
+        logger.error(
+            "Feed fetch error",
+            extra={"url": source.url, "status": result.status, "error": result.error},
+        )
+        _record_failure(source, now, result.error or f"HTTP {result.status}")
+        session.commit()
+        stats["status"] = "failed"
+        return stats
+
+    high_water = None if config.get("full_scan") else config.get("high_water")
+    try:
+        stored = _store_entries(
+            session,
+            source,
+            _feed_entries(source, result),
+            high_water,
+            compile_source_filter(config),
+        )
+    except Exception as exc:
+        session.rollback()
+        logger.error("Feed ingest error", extra={"url": source.url, "error": str(exc)})
+        _keep_payload(session, source, result)
+        _record_failure(source, now, str(exc))
+        session.commit()
+        stats["status"] = "failed"
+        return stats
+
+    _keep_payload(session, source, result)
+    config["http_cache"] = cache_validators(result, previous_cache)
+    if stored.high_water:
+        config["high_water"] = stored.high_water
+    source.config = config
+    _record_success(source, now, published=stored.published, changed=stored.inserted > 0)
+    session.commit()
+
+    stats.update(
+        {
+            "status": "ingested",
+            "inserted": stored.inserted,
+            "skipped": stored.skipped,
+            "clustered": stored.clustered,
+            "lookups_skipped": stored.lookups_skipped,
+            "dropped": stored.dropped,
+        }
+    )
+    return stats
+
+
+@celery_app.task(name="ingest_source")
+def ingest_source(source_id: str) -> dict:
+    started_at = time.time()
+    stats = _ingest_source(source_id)
+    # Wall-clock span, so summarize_ingest_run can compare a run to fetching serially.
+    stats["started_at"] = started_at
+    stats["finished_at"] = time.time()
+    logger.info("ingest_source complete", extra=stats)
+    return stats
+
+
+def _ingest_source(source_id: str) -> dict:
     with SessionLocal() as session:
-        sources = session.scalars(select(Source).where(Source.is_enabled.is_(True))).all()
+        source = session.get(Source, UUID(source_id))
+        if not source or not source.is_enabled:
+            return _empty_stats(source_id)
+        url = source.url
+        previous_cache = (source.config or {}).get("http_cache")
+        # Stream sources are spooled to disk, so even archives far over
+        # FEED_FETCH_MAX_BYTES are parsed without being held in memory.
+        spool = bool((source.config or {}).get("stream"))
 
-        for source in sources:
-            if source.x_account_id:
-                account = session.get(XAccount, source.x_account_id)
-                if not account or not account.is_enabled:
-                    continue
+    # No transaction or row lock is held while the feed downloads.
+    result = get_feed_fetcher().fetch(url, conditional_headers(previous_cache), spool=spool)
+    try:
+        with SessionLocal() as session:
+            source = session.scalar(
+                select(Source)
+                .where(Source.id == UUID(source_id))
+                .with_for_update(skip_locked=True)
+            )
+            if not source or not source.is_enabled or source.url != url:
+                return _empty_stats(source_id)
+            return _ingest_fetched(session, source, result)
+    finally:
+        result.close()
+
+
+@celery_app.task(name="summarize_ingest_run")
+def summarize_ingest_run(results: list[dict]) -> dict:
+    """Chord callback over one planner run's ingest_source results."""
+    stats = {
+        "sources": len(results),
+        "ingested": 0,
+        "unchanged": 0,
+        "failed": 0,
+        "skipped": 0,
+        "inserted": 0,
+        "clustered": 0,
+    }
+    for result in results:
+        status = result.get("status")
+        if status in stats:
+            stats[status] += 1
+        stats["inserted"] += result.get("inserted", 0)
+        stats["clustered"] += result.get("clustered", 0)
+
+    fetch_seconds = sum(result.get("elapsed", 0.0) for result in results)
+    spans = [
+        (result["started_at"], result["finished_at"])
+        for result in results
+        if "started_at" in result
+    ]
+    wall_seconds = 0.0
+    if spans:
+        wall_seconds = max(end for _, end in spans) - min(start for start, _ in spans)
+    stats["fetch_seconds"] = round(fetch_seconds, 3)
+    stats["wall_seconds"] = round(wall_seconds, 3)
+    # Serial fetch time over the run's wall clock, as FetchStats reports for fetch_many.
+    stats["speedup"] = round(fetch_seconds / wall_seconds, 2) if wall_seconds > 0 else 1.0
+    logger.info("ingest run complete", extra=stats)
+    return stats
+
+
+@celery_app.task(name="probe_sources", bind=True)
+def probe_sources(self, source_ids: list[str], workspace_id: str) -> dict:
+    # The import's first fetch doubles as its first ingest, so stored validators match
+    # the entries already captured and the next poll can safely get a 304.
+    progress = {
+        "workspace_id": workspace_id,
+        "total": len(source_ids),
+        "done": 0,
+        "ok": 0,
+        "failed": 0,
+        "feed_types": {},
+    }
+    fetcher = get_feed_fetcher()
+
+    with SessionLocal() as session:
+        for start in range(0, len(source_ids), PROBE_BATCH_SIZE):
+            batch = source_ids[start : start + PROBE_BATCH_SIZE]
+            sources = session.scalars(
+                select(Source)
+                .where(Source.id.in_([UUID(source_id) for source_id in batch]))
+                .where(Source.workspace_id == UUID(workspace_id))
+            ).all()
+            results, _ = fetcher.fetch_many([source.url for source in sources])
+
+            for source, result in zip(sources, results):
+                kind = feed_type(result.body) if result.ok else None
+                if result.ok and kind is None:
+                    result.error = "not a feed"
+                probe = {
+                    "probed_at": utc_now().isoformat(),
+                    "status": result.status,
+                    "reachable": result.status is not None and result.status < 400,
+                    "feed_type": kind,
+                    "error": result.error,
+                }
+                stats = _ingest_fetched(session, source, result)
+                # Recorded afterwards in its own commit: a failed parse rolls back the
+                # ingest transaction, and that is exactly the case the probe must report.
+                config = dict(source.config or {})
+                config["probe"] = probe
+                source.config = config
+                session.commit()
+
+                if stats["status"] == "failed":
+                    progress["failed"] += 1
+                else:
+                    progress["ok"] += 1
+                if kind:
+                    progress["feed_types"][kind] = progress["feed_types"].get(kind, 0) + 1
+
+            progress["done"] = min(len(source_ids), start + PROBE_BATCH_SIZE)
+            self.update_state(state="PROGRESS", meta=progress)
+
+    logger.info("probe_sources complete", extra=progress)
+    return progress
+
+
+@celery_app.task(name="replay_source_payloads")
+def replay_source_payloads(source_id: str, since: str | None = None) -> dict:
+    """Re-run parsing and idea creation over a source's stored payloads, oldest first."""
+    stats = {
+        "source_id": source_id,
+        "payloads": 0,
+        "missing": 0,
+        "failed": 0,
+        "inserted": 0,
+        "skipped": 0,
+        "clustered": 0,
+        "dropped": {},
+    }
+    store = get_payload_store()
+    if store is None:
+        return stats
 
+    with SessionLocal() as session:
+        source = session.get(Source, UUID(source_id))
+        if not source:
+            return stats
+        query = (
+            select(FeedPayload)
+            .where(FeedPayload.source_id == source.id)
+            .order_by(FeedPayload.fetched_at)
+        )
+        if since:
+            query = query.where(FeedPayload.fetched_at >= datetime.fromisoformat(since))
+        payloads = session.scalars(query).all()
+        source_filter = compile_source_filter(source.config)
+
+        for payload in payloads:
+            body = store.get(payload.content_hash)
+            if body is None:
+                stats["missing"] += 1
+                continue
+            result = FetchResult(
+                url=source.url,
+                status=200,
+                body=body,
+                headers={"content-type": payload.content_type or ""},
+                content_hash=payload.content_hash,
+            )
             try:
-                feed = feedparser.parse(source.url)
+                # No high-water mark: the point of a replay is to revisit every entry.
+                stored = _store_entries(
+                    session, source, _feed_entries(source, result), None, source_filter
+                )
+                session.commit()
             except Exception as exc:
-                failed += 1
-                logger.error("Feed parse error", extra={"url": source.url, "error": str(exc)})
+                session.rollback()
+                logger.error(
+                    "Payload replay error",
+                    extra={"source_id": source_id, "hash": payload.content_hash, "error": str(exc)},
+                )
+                stats["failed"] += 1
                 continue
+            stats["payloads"] += 1
+            stats["inserted"] += stored.inserted
+            stats["skipped"] += stored.skipped
+            stats["clustered"] += stored.clustered
+            for reason, count in stored.dropped.items():
+                stats["dropped"][reason] = stats["dropped"].get(reason, 0) + count
+
+    logger.info("replay_source_payloads complete", extra=stats)
+    return stats
 
-            if getattr(feed, "bozo", False):
-                logger.warning("Feed parse warning", extra={"url": source.url})
-
-            for entry in feed.entries:
-                title = entry.get("title")
-                url = entry.get("link") or entry.get("id")
-                summary = _entry_summary(entry)
-                fingerprint = _fingerprint(title, url, summary)
-
-                exists = session.scalar(select(Idea.id).where(Idea.fingerprint == fingerprint))
-                if exists:
-                    skipped += 1
-                    continue
-
-                idea = Idea(
-                    workspace_id=source.workspace_id,
-                    x_account_id=source.x_account_id,
-                    source_id=source.id,
-                    title=title,
-                    summary=summary,
-                    url=url,
-                    published_at=_entry_published(entry),
-                    raw_content=_entry_raw(entry),
-                    fingerprint=fingerprint,
-                    score=0.0,
-                    status="new",
-                )
-                session.add(idea)
-                inserted += 1
 
-            source.last_ingested_at = datetime.now(timezone.utc)
+@celery_app.task(name="replay_payloads")
+def replay_payloads(source_ids: list[str] | None = None, since: str | None = None) -> dict:
+    with SessionLocal() as session:
+        query = select(FeedPayload.source_id).distinct()
+        if source_ids:
+            query = query.where(FeedPayload.source_id.in_([UUID(value) for value in source_ids]))
+        if since:
+            query = query.where(FeedPayload.fetched_at >= datetime.fromisoformat(since))
+        targets = [str(source_id) for source_id in session.scalars(query).all()]
+
+    for source_id in targets:
+        replay_source_payloads.delay(source_id, since)
+
+    stats = {"dispatched": len(targets)}
+    logger.info("replay_payloads dispatched", extra=stats)
+    return stats
+
 
+@celery_app.task(name="prune_feed_payloads")
+def prune_feed_payloads() -> dict:
+    cutoff = retention_cutoff()
+    with SessionLocal() as session:
+        rows = session.execute(delete(FeedPayload).where(FeedPayload.fetched_at < cutoff))
         session.commit()
+    # Files are pruned by mtime, which put() refreshes whenever the same body is fetched again.
+    store = get_payload_store()
+    files = store.prune(cutoff) if store else 0
 
-    logger.info(
-        "ingest_sources complete",
-        extra={"inserted": inserted, "skipped": skipped, "failed": failed},
-    )
-    return {"inserted": inserted, "skipped": skipped, "failed": failed}
+    stats = {"rows": rows.rowcount, "files": files}
+    logger.info("prune_feed_payloads complete", extra=stats)
+    return stats
+
+
+@celery_app.task(name="ingest_sources")
+def ingest_sources(force: bool = False) -> dict:
+    now = utc_now()
+    horizon = now + timedelta(seconds=PLANNER_WINDOW_SECONDS)
+    planned: list[tuple[str, float]] = []
+
+    with SessionLocal() as session:
+        query = (
+            select(Source)
+            .outerjoin(XAccount, Source.x_account_id == XAccount.id)
+            .where(Source.is_enabled.is_(True))
+            .where(or_(Source.x_account_id.is_(None), XAccount.is_enabled.is_(True)))
+        )
+        if not force:
+            query = query.where(or_(Source.next_poll_at.is_(None), Source.next_poll_at < horizon))
+        sources = session.scalars(query).all()
+
+        for source in sources:
+            if force:
+                countdown = 0.0
+            elif source.next_poll_at and source.next_poll_at > now:
+                countdown = (source.next_poll_at - now).total_seconds()
+            else:
+                # New or overdue sources are spread across the window instead of bursting.
+                countdown = random.uniform(0, PLANNER_WINDOW_SECONDS)
+            # Lease the slot so the next planner run does not dispatch it twice.
+            source.next_poll_at = now + timedelta(seconds=countdown + DISPATCH_LEASE_SECONDS)
+            planned.append((str(source.id), countdown))
+
+        session.commit()
+
+    stats = {"dispatched": len(planned)}
+    if planned:
+        run = chord(
+            ingest_source.signature(args=[source_id], countdown=countdown)
+            for source_id, countdown in planned
+        )(summarize_ingest_run.s())
+        # Per-run totals (unchanged feeds, speedup) arrive on this task once all sources finish.
+        stats["summary_task_id"] = run.id
+    try:
+        bloom = get_idea_filter()
+        if not bloom.ready():
+            rebuild_idea_filter.delay()
+        stats["idea_filter"] = bloom.metrics()
+    except Exception as exc:
+        logger.warning("Idea filter unavailable", extra={"error": str(exc)})
+
+    logger.info("ingest_sources planned", extra=stats)
+    return stats
+
+
+@celery_app.task(name="rebuild_idea_filter")
+def rebuild_idea_filter() -> dict:
+    bloom = get_idea_filter()
+    with SessionLocal() as session:
+        fingerprints = session.scalars(
+            select(Idea.fingerprint).execution_options(yield_per=10_000)
+        )
+        added = bloom.rebuild(fingerprints)
+
+    stats = {"added": added, "idea_filter": bloom.metrics()}
+    logger.info("rebuild_idea_filter complete", extra=stats)
+    return stats
@@ -2,11 +2,21 @@ from __future__ import annotations
 
 import logging
 
+import numpy as np
 from sqlalchemy import func, select
 
 from app.db.session import SessionLocal
-from app.models import AccountSettings, Draft, Post, PostMetricsDaily, TemplatePerformance
+from app.models import (
+    AccountSettings,
+    Draft,
+    Idea,
+    Post,
+    PostMetricsDaily,
+    TemplatePerformance,
+)
+from app.services.scoring import LinearModel, feature_columns, feature_matrix, model_path
 from celery_app import celery_app
+from shared.utils.env import env_int
 from shared.utils.time import utc_now
 
 
@@ -89,3 +99,52 @@ def learn_templates() -> dict:
 
     logger.info("learn_templates complete", extra={"created": created})
     return {"created": created}
+
+
+def _min_training_samples() -> int:
+    return env_int("SCORING_MIN_SAMPLES", 50)
+
+
+@celery_app.task(name="train_scoring_models")
+def train_scoring_models() -> dict:
+    trained: dict[str, int] = {}
+    min_samples = _min_training_samples()
+    engagement = (
+        PostMetricsDaily.likes
+        + PostMetricsDaily.reposts
+        + PostMetricsDaily.replies
+        + PostMetricsDaily.bookmarks
+    )
+
+    with SessionLocal() as session:
+        rows = session.execute(
+            select(
+                Idea.workspace_id,
+                *feature_columns(),
+                (
+                    func.sum(engagement) / func.nullif(func.sum(PostMetricsDaily.impressions), 0)
+                ).label("engagement_rate"),
+            )
+            .join(Draft, Draft.idea_id == Idea.id)
+            .join(Post, Post.draft_id == Draft.id)
+            .join(PostMetricsDaily, PostMetricsDaily.post_id == Post.id)
+            .group_by(Idea.id)
+            .having(func.sum(PostMetricsDaily.impressions) > 0)
+        ).all()
+
+    by_workspace: dict[str, list] = {}
+    for row in rows:
+        by_workspace.setdefault(str(row.workspace_id), []).append(row)
+
+    for workspace_id, samples in by_workspace.items():
+        if len(samples) < min_samples:
+            continue
+        rates = np.array([float(row.engagement_rate) for row in samples])
+        # Percentile rank keeps a few viral posts from dominating the fit.
+        targets = rates.argsort().argsort() / max(len(rates) - 1, 1)
+        LinearModel.fit(feature_matrix(samples), targets).save(model_path(workspace_id))
+        trained[workspace_id] = len(samples)
+
+    stats = {"trained": len(trained), "samples": trained}
+    logger.info("train_scoring_models complete", extra=stats)
+    return stats
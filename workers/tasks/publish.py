@@ -11,6 +11,7 @@ from app.models import Draft, Post, ScheduleQueue, XAccount
 from app.services.safety import split_thread
 from app.services.x_client import get_x_client
 from celery_app import celery_app
+from shared.utils.env import env_int
 from shared.utils.time import utc_now
 
 
@@ -23,10 +24,7 @@ def _posting_disabled() -> bool:
 
 
 def _max_attempts() -> int:
-    try:
-        return int(os.getenv("PUBLISH_MAX_ATTEMPTS", "3"))
-    except ValueError:
-        return 3
+    return env_int("PUBLISH_MAX_ATTEMPTS", 3)
 
 
 def _next_backoff(attempts: int) -> timedelta:
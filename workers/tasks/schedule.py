@@ -3,11 +3,12 @@ from __future__ import annotations
 import logging
 from datetime import timedelta
 
-from sqlalchemy import func, select
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import selectinload
 
 from app.db.session import SessionLocal
 from app.models import AccountSettings, Draft, Post, ScheduleQueue, XAccount
-from app.services.safety import contains_link
+from app.services.safety import draft_has_link
 from app.services.scheduler import (
     _allowed_hours,
     _candidate_times,
@@ -88,6 +89,7 @@ def schedule_posts() -> dict:
                 select(Draft)
                 .where(Draft.x_account_id == account.id)
                 .where(Draft.status == "approved")
+                .options(selectinload(Draft.idea))
             ).all()
             if not drafts:
                 continue
@@ -114,7 +116,7 @@ def schedule_posts() -> dict:
 
                 if draft.is_thread:
                     thread_count += 1
-                if contains_link(draft.content):
+                if draft_has_link(draft):
                     link_count += 1
 
                 schedule_item = ScheduleQueue(
@@ -126,6 +128,16 @@ def schedule_posts() -> dict:
                 session.add(schedule_item)
                 draft.status = "scheduled"
                 drafts.remove(draft)
+                if draft.idea_id:
+                    # Other formats of the same idea would repeat the story; retire them.
+                    session.execute(
+                        update(Draft)
+                        .where(Draft.idea_id == draft.idea_id)
+                        .where(Draft.id != draft.id)
+                        .where(Draft.status.in_(["draft", "approved"]))
+                        .values(status="superseded")
+                    )
+                    drafts = [other for other in drafts if other.idea_id != draft.idea_id]
                 scheduled += 1
                 scheduled_local += 1
 
@@ -2,46 +2,75 @@ from __future__ import annotations
 
 import logging
 
-from sqlalchemy import select
+from sqlalchemy import Float, column, select, update, values
+from sqlalchemy.dialects.postgresql import UUID as PGUUID
 
 from app.db.session import SessionLocal
 from app.models import Idea
+from app.services.scoring import feature_columns, feature_matrix, get_scoring_model
 from celery_app import celery_app
-from shared.utils.time import utc_now
+from shared.utils.env import env_int
 
 
 logger = logging.getLogger(__name__)
 
 
-def _score_idea(idea: Idea) -> float:
-    score = 0.0
+def _batch_size() -> int:
+    return max(1, env_int("SCORE_BATCH_SIZE", 5000))
 
-    if idea.title:
-        score += min(len(idea.title) / 120, 1.0) * 0.4
-    if idea.summary:
-        score += min(len(idea.summary) / 500, 1.0) * 0.4
 
-    if idea.published_at:
-        age_days = (utc_now() - idea.published_at).days
-        recency = max(0.0, 1.0 - (age_days / 7))
-        score += recency * 0.2
+def _score_chunk(session, rows) -> int:
+    by_workspace: dict[str, list] = {}
+    for row in rows:
+        by_workspace.setdefault(str(row.workspace_id), []).append(row)
 
-    return round(score, 4)
+    scored_rows: list[tuple] = []
+    for workspace_id, workspace_rows in by_workspace.items():
+        model = get_scoring_model(workspace_id)
+        scores = model.predict(feature_matrix(workspace_rows))
+        scored_rows.extend((row.id, float(score)) for row, score in zip(workspace_rows, scores))
+
+    scored = values(
+        column("id", PGUUID(as_uuid=True)), column("score", Float), name="scored"
+    ).data(scored_rows)
+    # One UPDATE ... FROM (VALUES ...) per chunk; the status guard skips rows changed meanwhile.
+    result = session.execute(
+        update(Idea)
+        .where(Idea.id == scored.c.id)
+        .where(Idea.status == "new")
+        .values(score=scored.c.score, status="scored"),
+        execution_options={"synchronize_session": False},
+    )
+    session.commit()
+    return result.rowcount
 
 
 @celery_app.task(name="score_ideas")
 def score_ideas() -> dict:
     updated = 0
+    chunks = 0
+    batch_size = _batch_size()
+    last_id = None
 
     with SessionLocal() as session:
-        ideas = session.scalars(select(Idea).where(Idea.status == "new")).all()
-
-        for idea in ideas:
-            idea.score = _score_idea(idea)
-            idea.status = "scored"
-            updated += 1
-
-        session.commit()
-
-    logger.info("score_ideas complete", extra={"updated": updated})
-    return {"updated": updated}
+        while True:
+            # Keyset pagination over the primary key; only features are read, never the text.
+            # Recency is not stored: rankings add it at query time (app.services.scoring).
+            query = (
+                select(Idea.id, Idea.workspace_id, *feature_columns())
+                .where(Idea.status == "new")
+                .order_by(Idea.id)
+                .limit(batch_size)
+            )
+            if last_id is not None:
+                query = query.where(Idea.id > last_id)
+            rows = session.execute(query).all()
+            if not rows:
+                break
+            updated += _score_chunk(session, rows)
+            chunks += 1
+            last_id = rows[-1].id
+
+    stats = {"updated": updated, "chunks": chunks}
+    logger.info("score_ideas complete", extra=stats)
+    return stats